@@ -8,16 +8,15 @@ const Stripe = require('stripe')
 const cloudinary = require('cloudinary').v2
 const axios = require('axios')
 const jwt = require('jsonwebtoken')
-const bcrypt = require('bcryptjs')
 const path = require('path')
 const fs = require('fs')
 
 dotenv.config()
 
 // MongoDB setup
-const { connectDB } = require('../db/mongoClient')
+const { connectDB, getCommandStats } = require('../db/mongoClient')
 const db = require('../db/mongo')
-const { ProcessedEvent } = require('./models.js')
+const { ProcessedEvent, catalogEvents } = require('./models.js')
 
 const logger = winston.createLogger({
     level: process.env.LOG_LEVEL || 'info',
@@ -65,7 +64,7 @@ app.use(helmet({
 
 const rateLimitMap = new Map()
 const RATE_LIMIT_WINDOW = 15 * 60 * 1000
-const RATE_LIMIT_MAX = 100
+const RATE_LIMIT_MAX = parseInt(process.env.RATE_LIMIT_MAX) || 100
 
 setInterval(() => {
     const now = Date.now()
@@ -118,6 +117,20 @@ const authenticateToken = (req, res, next) => {
     }
 }
 
+const adminEmails = (process.env.ADMIN_EMAILS || '').split(',').map(e => e.trim().toLowerCase()).filter(Boolean)
+
+const isAdmin = async (req, res, next) => {
+    try {
+        const user = await db.getUserById(req.user.id)
+        if (!user || !adminEmails.includes(String(user.email).toLowerCase())) {
+            return res.status(403).json({ error: 'forbidden' })
+        }
+        next()
+    } catch (e) {
+        return res.status(403).json({ error: 'forbidden' })
+    }
+}
+
 const addCredits = async (userId, amount) => {
     return await db.addCredits(userId, amount)
 }
@@ -238,6 +251,28 @@ const packsConfig = require('./shared/config/packs')
 const catalogConfig = require('./shared/config/catalog')
 const catalogFullConfig = require('../shared/config/catalog')
 const A2EService = require('./services/a2e')
+const SnapshotCache = require('./services/snapshot-cache')
+const PasswordHasher = require('./services/password-hasher')
+const EventLoopMonitor = require('./services/event-loop-monitor')
+
+// bcrypt runs on a bounded worker pool so auth bursts don't block the event loop
+const passwordHasher = new PasswordHasher()
+const eventLoopMonitor = new EventLoopMonitor().start()
+
+const sendHashBusy = (res) => {
+    res.set('Retry-After', '1')
+    return res.status(503).json({ error: 'server_busy' })
+}
+
+// Public payloads served from in-memory snapshots with ETag/304 support
+const snapshots = new SnapshotCache()
+const STATS_TTL_MS = parseInt(process.env.STATS_SNAPSHOT_TTL_MS) || 10000
+
+catalogEvents.on('change', (collection) => {
+    // Catalog embeds SKU data, so any catalog write drops every derived snapshot
+    snapshots.invalidate()
+    logger.info({ msg: 'snapshots_invalidated', collection })
+})
 
 const pollingJobs = new Map()
 
@@ -302,18 +337,37 @@ app.get('/alive', (req, res) => {
     res.status(200).json({ status: 'alive' })
 })
 
+// Operational counters are admin-only: they reveal load and cache behaviour
+app.get('/metrics', authenticateToken, isAdmin, (req, res) => {
+    res.status(200).json({
+        event_loop_lag: eventLoopMonitor.stats(),
+        password_hasher: passwordHasher.stats(),
+        db_commands: getCommandStats(),
+        snapshots: {
+            hits: snapshots.counters.hits,
+            misses: snapshots.counters.misses,
+            not_modified: snapshots.counters.not_modified
+        }
+    })
+})
+
+const buildStats = async () => {
+    const stats = await db.getStats()
+    const totalUsers = stats.total_users || 0
+    // Note: paying_users and revenue would need purchases to be aggregated
+    return {
+        videos: stats.videos || 0,
+        paying_users: 0,
+        total_users: totalUsers,
+        conversion_rate: 0,
+        revenue_cents: 0
+    }
+}
+
 app.get('/stats', async (req, res) => {
     try {
-        const stats = await db.getStats()
-        const totalUsers = stats.total_users || 0
-        // Note: paying_users and revenue would need purchases to be aggregated
-        res.json({
-            videos: stats.videos || 0,
-            paying_users: 0,
-            total_users: totalUsers,
-            conversion_rate: 0,
-            revenue_cents: 0
-        })
+        // Counters change on every signup/job, so this snapshot only lives briefly
+        await snapshots.send(req, res, 'stats', buildStats, { ttlMs: STATS_TTL_MS })
     } catch (e) {
         logger.error({ msg: 'stats_error', error: String(e) })
         res.status(500).json({ error: 'stats_fetch_failed' })
@@ -341,7 +395,7 @@ app.post('/api/auth/signup', async (req, res) => {
             return res.status(409).json({ error: 'email_exists' })
         }
 
-        const passwordHash = await bcrypt.hash(password, 10)
+        const passwordHash = await passwordHasher.hash(password, 10)
         const user = await db.createUser(email, passwordHash)
 
         // Award free signup credits
@@ -360,6 +414,7 @@ app.post('/api/auth/signup', async (req, res) => {
             }
         })
     } catch (e) {
+        if (e.code === 'HASH_QUEUE_FULL') return sendHashBusy(res)
         logger.error({ msg: 'signup_error', error: String(e) })
         res.status(500).json({ error: 'signup_failed' })
     }
@@ -377,7 +432,7 @@ app.post('/api/auth/login', async (req, res) => {
             return res.status(401).json({ error: 'invalid_credentials' })
         }
 
-        const valid = await bcrypt.compare(password, user.password_hash)
+        const valid = await passwordHasher.compare(password, user.password_hash)
         if (!valid) {
             return res.status(401).json({ error: 'invalid_credentials' })
         }
@@ -393,6 +448,7 @@ app.post('/api/auth/login', async (req, res) => {
             }
         })
     } catch (e) {
+        if (e.code === 'HASH_QUEUE_FULL') return sendHashBusy(res)
         logger.error({ msg: 'login_error', error: String(e) })
         res.status(500).json({ error: 'login_failed' })
     }
@@ -411,10 +467,7 @@ app.get('/api/auth/me', authenticateToken, async (req, res) => {
     }
 })
 
-app.get('/api/web/catalog', async (req, res) => {
-    console.log('Catalog endpoint called');
-    console.log('Catalog config:', catalogConfig);
-
+const buildCatalog = async () => {
     // Transform flat catalog array into categorized structure
     const categorized = {
         categories: {
@@ -435,12 +488,8 @@ app.get('/api/web/catalog', async (req, res) => {
         user_plan: null // Will be populated based on user data if needed
     };
 
-    if (!catalogConfig || !catalogConfig.catalog) {
-        console.error('Catalog config not found');
-        return res.status(500).json({ error: 'catalog_config_missing' });
-    }
-
     let skuByCode = {}
+    let skuLookupFailed = false
     try {
         const skus = await db.getSkus(true)
         skuByCode = (skus || []).reduce((acc, sku) => {
@@ -448,6 +497,7 @@ app.get('/api/web/catalog', async (req, res) => {
             return acc
         }, {})
     } catch (e) {
+        skuLookupFailed = true
         logger.warn({ msg: 'catalog_sku_lookup_failed', error: String(e) })
     }
 
@@ -485,8 +535,22 @@ app.get('/api/web/catalog', async (req, res) => {
         }
     });
 
-    console.log('Returning catalog:', categorized);
-    res.json(categorized);
+    // Config-only prices are a stopgap: serve them, but retry Mongo next request
+    return skuLookupFailed ? SnapshotCache.uncached(categorized) : categorized;
+}
+
+app.get('/api/web/catalog', async (req, res) => {
+    if (!catalogConfig || !catalogConfig.catalog) {
+        console.error('Catalog config not found');
+        return res.status(500).json({ error: 'catalog_config_missing' });
+    }
+
+    try {
+        await snapshots.send(req, res, 'catalog', buildCatalog)
+    } catch (e) {
+        logger.error({ msg: 'catalog_error', error: String(e) })
+        res.status(500).json({ error: 'catalog_fetch_failed' })
+    }
 })
 
 app.post('/api/pricing/quote', authenticateToken, async (req, res) => {
@@ -548,21 +612,25 @@ app.post('/api/pricing/quote', authenticateToken, async (req, res) => {
 })
 
 // Pricing Plans endpoint
+const buildPlans = async () => {
+    const plans = await db.getPlans(true);
+    const formattedPlans = plans.map(plan => ({
+        id: plan.id,
+        code: plan.code,
+        name: plan.name,
+        description: plan.description || '',
+        monthly_price_usd: plan.monthly_price_cents / 100,
+        monthly_price_cents: plan.monthly_price_cents,
+        included_seconds: plan.included_seconds || 0,
+        overage_rate_per_second_cents: plan.overage_rate_per_second_cents || 0,
+        active: plan.active
+    }));
+    return { plans: formattedPlans };
+};
+
 app.get('/api/plans', async (req, res) => {
     try {
-        const plans = await db.getPlans(true);
-        const formattedPlans = plans.map(plan => ({
-            id: plan.id,
-            code: plan.code,
-            name: plan.name,
-            description: plan.description || '',
-            monthly_price_usd: plan.monthly_price_cents / 100,
-            monthly_price_cents: plan.monthly_price_cents,
-            included_seconds: plan.included_seconds || 0,
-            overage_rate_per_second_cents: plan.overage_rate_per_second_cents || 0,
-            active: plan.active
-        }));
-        res.json({ plans: formattedPlans });
+        await snapshots.send(req, res, 'plans', buildPlans);
     } catch (e) {
         logger.error({ msg: 'plans_fetch_error', error: String(e) });
         res.status(500).json({ error: 'failed_to_load_plans' });
@@ -570,34 +638,38 @@ app.get('/api/plans', async (req, res) => {
 });
 
 // SKUs endpoint
-app.get('/api/skus', async (req, res) => {
-    try {
-        const vectorId = req.query.vector_id;
-        let skus = await db.getSkus(true);
+const buildSkus = async (vectorId) => {
+    let skus = await db.getSkus(true);
 
-        // Filter by vector_id if provided
-        if (vectorId) {
-            skus = skus.filter(sku => sku.vector_id === vectorId);
-        }
+    // Filter by vector_id if provided
+    if (vectorId) {
+        skus = skus.filter(sku => sku.vector_id === vectorId);
+    }
 
-        const formattedSkus = skus.map(sku => ({
-            id: sku.id,
-            code: sku.code,
-            name: sku.name,
-            description: sku.description || '',
-            vector_id: sku.vector_id || '',
-            vector_name: sku.vector_name || '',
-            vector_code: sku.vector_code || '',
-            base_price_usd: (sku.base_price_cents / 100).toFixed(2),
-            base_price_cents: sku.base_price_cents,
-            base_credits: sku.base_credits || 0,
-            default_flags: sku.default_flags || [],
-            price: sku.base_price_cents / 100,
-            currency: 'USD',
-            active: sku.active
-        }));
-
-        res.json({ skus: formattedSkus });
+    const formattedSkus = skus.map(sku => ({
+        id: sku.id,
+        code: sku.code,
+        name: sku.name,
+        description: sku.description || '',
+        vector_id: sku.vector_id || '',
+        vector_name: sku.vector_name || '',
+        vector_code: sku.vector_code || '',
+        base_price_usd: (sku.base_price_cents / 100).toFixed(2),
+        base_price_cents: sku.base_price_cents,
+        base_credits: sku.base_credits || 0,
+        default_flags: sku.default_flags || [],
+        price: sku.base_price_cents / 100,
+        currency: 'USD',
+        active: sku.active
+    }));
+
+    return { skus: formattedSkus };
+};
+
+app.get('/api/skus', async (req, res) => {
+    try {
+        const vectorId = typeof req.query.vector_id === 'string' ? req.query.vector_id : '';
+        await snapshots.send(req, res, `skus:${vectorId}`, () => buildSkus(vectorId));
     } catch (e) {
         logger.error({ msg: 'skus_fetch_error', error: String(e) });
         res.status(500).json({ error: 'failed_to_load_skus' });
@@ -605,33 +677,55 @@ app.get('/api/skus', async (req, res) => {
 });
 
 // Flags endpoint
+const buildFlags = async () => {
+    const flags = await db.getFlags(true);
+    const formattedFlags = flags.map(flag => ({
+        id: flag.id,
+        code: flag.code,
+        label: flag.label,
+        description: flag.description || '',
+        price_multiplier: flag.price_multiplier || 1.0,
+        price_add_flat_cents: flag.price_add_flat_cents || 0,
+        active: flag.active
+    }));
+    return { flags: formattedFlags };
+};
+
 app.get('/api/flags', async (req, res) => {
     try {
-        const flags = await db.getFlags(true);
-        const formattedFlags = flags.map(flag => ({
-            id: flag.id,
-            code: flag.code,
-            label: flag.label,
-            description: flag.description || '',
-            price_multiplier: flag.price_multiplier || 1.0,
-            price_add_flat_cents: flag.price_add_flat_cents || 0,
-            active: flag.active
-        }));
-        res.json({ flags: formattedFlags });
+        await snapshots.send(req, res, 'flags', buildFlags);
     } catch (e) {
         logger.error({ msg: 'flags_fetch_error', error: String(e) });
         res.status(500).json({ error: 'failed_to_load_flags' });
     }
 });
 
+// Snapshot cache inspection and manual invalidation (e.g. after out-of-process seeding)
+app.get('/api/admin/cache', authenticateToken, isAdmin, (req, res) => {
+    res.json(snapshots.stats())
+})
+
+app.post('/api/admin/cache/invalidate', authenticateToken, isAdmin, (req, res) => {
+    const prefix = typeof req.body?.prefix === 'string' ? req.body.prefix : ''
+    snapshots.invalidate(prefix)
+    logger.info({ msg: 'snapshots_invalidated', prefix, admin: req.user.id })
+    res.json({ invalidated: true, prefix })
+})
+
 // Test endpoint
 app.get('/api/web/test', (req, res) => {
     console.log('Test endpoint called');
     res.json({ message: 'API is working', timestamp: new Date().toISOString() });
 })
 
-app.get('/api/web/packs', (req, res) => {
-    res.json(packsConfig.packs)
+app.get('/api/web/packs', async (req, res) => {
+    try {
+        // Packs come from static config, so the snapshot never expires on its own
+        await snapshots.send(req, res, 'packs', () => packsConfig.packs, { ttlMs: Infinity })
+    } catch (e) {
+        logger.error({ msg: 'packs_error', error: String(e) })
+        res.status(500).json({ error: 'packs_fetch_failed' })
+    }
 })
 
 app.post('/api/web/checkout', authenticateToken, async (req, res) => {
@@ -874,6 +968,12 @@ app.get('/api/web/status', async (req, res) => {
     }
 })
 
+// SKU tool configs and advanced/batch jobs only; the upload, A2E and
+// monitoring routes in the same module are not mounted
+const enhancedApiRoutes = require('../routes/enhanced-api')(db, authenticateToken, isAdmin, { jobsOnly: true })
+app.use(enhancedApiRoutes)
+logger.info({ msg: 'enhanced_api_routes_registered' })
+
 const port = process.env.PORT || 3000
 
 if (process.env.NODE_ENV === 'production') {
@@ -1,4 +1,5 @@
 const mongoose = require('mongoose');
+const { EventEmitter } = require('events');
 
 // User Schema
 const userSchema = new mongoose.Schema({
@@ -199,7 +200,8 @@ const skuCustomerOptionSchema = new mongoose.Schema({
 const jobStepSchema = new mongoose.Schema({
   job_id: { type: mongoose.Schema.Types.ObjectId, ref: 'Job', required: true },
   step_order: { type: Number, required: true },
-  tool_type: { type: String, required: true },
+  step_name: { type: String },
+  tool_type: { type: String, required: true }, // A2E endpoint for SKU tool steps
   status: { type: String, default: 'pending' },
   task_id: { type: String },
   input_data: { type: mongoose.Schema.Types.Mixed },
@@ -269,18 +271,30 @@ const statsSchema = new mongoose.Schema({
 
 // Indexes for performance
 jobSchema.index({ user_id: 1, created_at: -1 });
-jobSchema.index({ status: 1 });
+jobSchema.index({ status: 1, a2e_task_id: 1 });
 jobSchema.index({ a2e_task_id: 1 });
 purchaseSchema.index({ user_id: 1, created_at: -1 });
-userPlanSchema.index({ user_id: 1 });
+userPlanSchema.index({ user_id: 1, start_date: -1 });
 planUsageSchema.index({ user_id: 1, period_start: 1, period_end: 1 });
-orderSchema.index({ user_id: 1 });
+orderSchema.index({ user_id: 1, created_at: -1 });
+miniappCreationSchema.index({ user_id: 1, type: 1, created_at: -1 });
 skuToolStepSchema.index({ config_id: 1, step_order: 1 });
 skuCustomerOptionSchema.index({ config_id: 1 });
 jobStepSchema.index({ job_id: 1, step_order: 1 });
 analyticsEventSchema.index({ type: 1, created_at: -1 });
 analyticsEventSchema.index({ user_id: 1, created_at: -1 });
 
+// Emit 'change' with the collection name whenever catalog data (SKUs, plans,
+// flags) is written, so cached public payloads can be invalidated
+const catalogEvents = new EventEmitter();
+const catalogWriteHooks = [
+  'save', 'insertMany', 'updateOne', 'updateMany', 'replaceOne',
+  'findOneAndUpdate', 'findOneAndReplace', 'findOneAndDelete', 'deleteOne', 'deleteMany'
+];
+for (const [name, schema] of [['skus', skuSchema], ['plans', planSchema], ['flags', flagSchema]]) {
+  schema.post(catalogWriteHooks, () => catalogEvents.emit('change', name));
+}
+
 // Models
 const User = mongoose.model('User', userSchema);
 const UserCredits = mongoose.model('UserCredits', userCreditsSchema);
@@ -331,5 +345,6 @@ module.exports = {
   A2eHealthCheck,
   SystemHealthMetric,
   SchemaMigration,
-  Stats
+  Stats,
+  catalogEvents
 };
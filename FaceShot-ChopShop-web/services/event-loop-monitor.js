@@ -0,0 +1,58 @@
+const { monitorEventLoopDelay } = require('perf_hooks')
+
+const NS_PER_MS = 1e6
+
+/**
+ * Event-loop lag sampled with perf_hooks.
+ *
+ * The histogram is rolled every `windowMs`, so stats() reports both the
+ * window in progress and the last complete one.
+ */
+class EventLoopMonitor {
+    constructor({ resolutionMs = 10, windowMs = 60000 } = {}) {
+        this.histogram = monitorEventLoopDelay({ resolution: resolutionMs })
+        this.windowMs = windowMs
+        this.windowStartedAt = Date.now()
+        this.previous = null
+        this.timer = null
+    }
+
+    start() {
+        if (this.timer) return this
+        this.histogram.enable()
+        this.timer = setInterval(() => this.roll(), this.windowMs)
+        this.timer.unref()
+        return this
+    }
+
+    stop() {
+        if (this.timer) clearInterval(this.timer)
+        this.timer = null
+        this.histogram.disable()
+    }
+
+    roll() {
+        this.previous = this.summary()
+        this.histogram.reset()
+        this.windowStartedAt = Date.now()
+    }
+
+    summary() {
+        const h = this.histogram
+        const ms = (ns) => Number.isFinite(ns) ? Math.round(ns / NS_PER_MS * 100) / 100 : 0
+        return {
+            window_ms: Date.now() - this.windowStartedAt,
+            samples: h.count,
+            mean_ms: h.count ? ms(h.mean) : 0,
+            p50_ms: h.count ? ms(h.percentile(50)) : 0,
+            p99_ms: h.count ? ms(h.percentile(99)) : 0,
+            max_ms: h.count ? ms(h.max) : 0
+        }
+    }
+
+    stats() {
+        return { current: this.summary(), previous: this.previous }
+    }
+}
+
+module.exports = EventLoopMonitor
@@ -0,0 +1,14 @@
+const { parentPort } = require('worker_threads')
+const bcrypt = require('bcryptjs')
+
+// Runs bcrypt off the main event loop; one job at a time per worker
+parentPort.on('message', ({ id, op, password, hash, rounds }) => {
+    try {
+        const result = op === 'hash'
+            ? bcrypt.hashSync(password, rounds)
+            : bcrypt.compareSync(password, hash)
+        parentPort.postMessage({ id, result })
+    } catch (error) {
+        parentPort.postMessage({ id, error: error.message })
+    }
+})
@@ -0,0 +1,156 @@
+const os = require('os')
+const path = require('path')
+const { Worker } = require('worker_threads')
+
+const WORKER_PATH = path.join(__dirname, 'password-hasher-worker.js')
+
+const defaultPoolSize = () => {
+    const cpus = typeof os.availableParallelism === 'function' ? os.availableParallelism() : os.cpus().length
+    // Leave a core for the main event loop
+    return Math.max(1, Math.min(4, cpus - 1))
+}
+
+/**
+ * Bounded worker-thread pool for bcrypt hashing and comparison.
+ *
+ * Hashing is CPU-bound and bcryptjs is pure JS, so running it on the main
+ * thread stalls every other request. Jobs beyond the pool size wait in a
+ * queue of at most `maxQueue`; past that, calls reject with code
+ * HASH_QUEUE_FULL so callers can shed load instead of piling up.
+ */
+class PasswordHasher {
+    constructor({
+        size = parseInt(process.env.PASSWORD_HASH_WORKERS) || defaultPoolSize(),
+        maxQueue = parseInt(process.env.PASSWORD_HASH_MAX_QUEUE) || 64,
+        rounds = 10,
+        workerPath = WORKER_PATH
+    } = {}) {
+        this.size = size
+        this.maxQueue = maxQueue
+        this.rounds = rounds
+        this.workerPath = workerPath
+        this.workers = []
+        this.idle = []
+        this.queue = []
+        this.inflight = new Map()
+        this.nextId = 0
+        this.counters = { completed: 0, failed: 0, rejected: 0 }
+    }
+
+    hash(password, rounds = this.rounds) {
+        return this.submit({ op: 'hash', password, rounds })
+    }
+
+    compare(password, hash) {
+        return this.submit({ op: 'compare', password, hash })
+    }
+
+    submit(job) {
+        return new Promise((resolve, reject) => {
+            const task = { ...job, id: ++this.nextId, resolve, reject }
+            const worker = this.idle.pop() || this.spawn()
+
+            if (worker) return this.dispatch(worker, task)
+
+            if (this.queue.length >= this.maxQueue) {
+                this.counters.rejected++
+                const error = new Error('password_hash_queue_full')
+                error.code = 'HASH_QUEUE_FULL'
+                return reject(error)
+            }
+
+            this.queue.push(task)
+        })
+    }
+
+    spawn() {
+        if (this.workers.length >= this.size) return null
+
+        const worker = new Worker(this.workerPath)
+        // Don't keep the process alive just for idle hash workers
+        worker.unref()
+        worker.on('message', (message) => this.onMessage(worker, message))
+        worker.on('error', (error) => this.onWorkerExit(worker, error))
+        worker.on('exit', (code) => {
+            if (code !== 0) this.onWorkerExit(worker, new Error(`password hash worker exited with code ${code}`))
+        })
+        this.workers.push(worker)
+        return worker
+    }
+
+    dispatch(worker, task) {
+        worker.currentTask = task
+        this.inflight.set(task.id, task)
+        const { resolve, reject, ...message } = task
+        worker.postMessage(message)
+    }
+
+    onMessage(worker, { id, result, error }) {
+        const task = this.inflight.get(id)
+        this.inflight.delete(id)
+        worker.currentTask = null
+
+        if (task) {
+            if (error) {
+                this.counters.failed++
+                task.reject(new Error(error))
+            } else {
+                this.counters.completed++
+                task.resolve(result)
+            }
+        }
+
+        this.release(worker)
+    }
+
+    release(worker) {
+        const next = this.queue.shift()
+        if (next) return this.dispatch(worker, next)
+        this.idle.push(worker)
+    }
+
+    onWorkerExit(worker, error) {
+        if (!this.workers.includes(worker)) return
+        this.workers = this.workers.filter(w => w !== worker)
+        this.idle = this.idle.filter(w => w !== worker)
+
+        const task = worker.currentTask
+        if (task) {
+            this.inflight.delete(task.id)
+            this.counters.failed++
+            task.reject(error)
+        }
+
+        // Replace the crashed worker so queued jobs still drain
+        const next = this.queue.shift()
+        if (next) {
+            const replacement = this.spawn()
+            if (replacement) this.dispatch(replacement, next)
+            else this.queue.unshift(next)
+        }
+    }
+
+    stats() {
+        return {
+            size: this.size,
+            workers: this.workers.length,
+            busy: this.workers.length - this.idle.length,
+            queued: this.queue.length,
+            max_queue: this.maxQueue,
+            ...this.counters
+        }
+    }
+
+    async close() {
+        const workers = this.workers
+        this.workers = []
+        this.idle = []
+        for (const task of [...this.queue.splice(0), ...this.inflight.values()]) {
+            task.reject(new Error('password_hasher_closed'))
+        }
+        this.inflight.clear()
+        await Promise.all(workers.map(w => w.terminate()))
+    }
+}
+
+module.exports = PasswordHasher
@@ -0,0 +1,185 @@
+const crypto = require('crypto')
+const zlib = require('zlib')
+
+// Payloads smaller than this are not worth a compression round trip
+const COMPRESS_MIN_BYTES = 1024
+
+const DEFAULT_TTL_MS = parseInt(process.env.SNAPSHOT_TTL_MS) || 5 * 60 * 1000
+
+// Keys can carry query values (e.g. vector_id), so cap how many are kept
+const DEFAULT_MAX_ENTRIES = 256
+
+// Wraps a build result that should be served but not kept
+class Uncached {
+    constructor(payload) {
+        this.payload = payload
+    }
+}
+
+/**
+ * In-memory snapshots of public JSON payloads.
+ *
+ * Each snapshot holds the serialized body, its ETag and pre-compressed
+ * gzip/brotli variants, so a hit is a header check and a buffer write.
+ * Snapshots expire after their TTL or when invalidated (admin changes).
+ */
+class SnapshotCache {
+    constructor({ ttlMs = DEFAULT_TTL_MS, maxEntries = DEFAULT_MAX_ENTRIES } = {}) {
+        this.ttlMs = ttlMs
+        this.maxEntries = maxEntries
+        this.entries = new Map()
+        this.pending = new Map()
+        this.generation = 0
+        this.counters = { hits: 0, misses: 0, not_modified: 0, invalidations: 0 }
+    }
+
+    /**
+     * Return from a build to serve `payload` this once without storing it,
+     * e.g. a fallback assembled while the database was unreachable.
+     */
+    static uncached(payload) {
+        return new Uncached(payload)
+    }
+
+    static serialize(payload) {
+        const body = Buffer.from(JSON.stringify(payload))
+        const entry = {
+            body,
+            etag: `W/"${crypto.createHash('sha1').update(body).digest('base64url')}"`,
+            gzip: null,
+            br: null,
+            builtAt: Date.now()
+        }
+
+        if (body.length >= COMPRESS_MIN_BYTES) {
+            entry.gzip = zlib.gzipSync(body)
+            entry.br = zlib.brotliCompressSync(body, {
+                params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 5 }
+            })
+        }
+
+        return entry
+    }
+
+    /**
+     * Return the snapshot for `key`, building it with `build()` on a miss.
+     * Concurrent misses share one build.
+     */
+    async get(key, build, ttlMs = this.ttlMs) {
+        const entry = this.entries.get(key)
+        if (entry && Date.now() - entry.builtAt < ttlMs) {
+            this.counters.hits++
+            return entry
+        }
+
+        if (this.pending.has(key)) return this.pending.get(key)
+
+        this.counters.misses++
+        const generation = this.generation
+        const promise = (async () => {
+            try {
+                const built = await build()
+                const degraded = built instanceof Uncached
+                const fresh = SnapshotCache.serialize(degraded ? built.payload : built)
+                // Don't store a payload that was read before an invalidation
+                if (!degraded && generation === this.generation) this.store(key, fresh)
+                return fresh
+            } finally {
+                this.pending.delete(key)
+            }
+        })()
+
+        this.pending.set(key, promise)
+        return promise
+    }
+
+    store(key, entry) {
+        this.entries.delete(key)
+        if (this.entries.size >= this.maxEntries) {
+            // Maps iterate in insertion order, so the first key is the oldest
+            this.entries.delete(this.entries.keys().next().value)
+        }
+        this.entries.set(key, entry)
+    }
+
+    /**
+     * Drop snapshots whose key starts with `prefix` (all when omitted).
+     */
+    invalidate(prefix = '') {
+        this.generation++
+        this.counters.invalidations++
+        for (const key of this.entries.keys()) {
+            if (key.startsWith(prefix)) this.entries.delete(key)
+        }
+    }
+
+    /**
+     * Serve a snapshot with ETag / If-None-Match and Accept-Encoding negotiation.
+     */
+    async send(req, res, key, build, { ttlMs, maxAge = 0 } = {}) {
+        const entry = await this.get(key, build, ttlMs)
+
+        res.set('ETag', entry.etag)
+        res.set('Cache-Control', `public, max-age=${maxAge}, must-revalidate`)
+        res.set('Vary', 'Accept-Encoding')
+
+        if (matchesETag(req.headers['if-none-match'], entry.etag)) {
+            this.counters.not_modified++
+            return res.status(304).end()
+        }
+
+        const encoding = negotiateEncoding(req.headers['accept-encoding'], entry)
+        const body = encoding ? entry[encoding] : entry.body
+
+        res.status(200)
+        res.set('Content-Type', 'application/json; charset=utf-8')
+        if (encoding) res.set('Content-Encoding', encoding)
+        res.set('Content-Length', String(body.length))
+        res.end(body)
+    }
+
+    stats() {
+        return {
+            ...this.counters,
+            entries: [...this.entries.entries()].map(([key, entry]) => ({
+                key,
+                etag: entry.etag,
+                bytes: entry.body.length,
+                gzip_bytes: entry.gzip ? entry.gzip.length : null,
+                br_bytes: entry.br ? entry.br.length : null,
+                age_ms: Date.now() - entry.builtAt
+            }))
+        }
+    }
+}
+
+function stripWeak(tag) {
+    return tag.startsWith('W/') ? tag.slice(2) : tag
+}
+
+function matchesETag(header, etag) {
+    if (!header) return false
+    if (header.trim() === '*') return true
+    const wanted = stripWeak(etag)
+    return header.split(',').some(tag => stripWeak(tag.trim()) === wanted)
+}
+
+function negotiateEncoding(header, entry) {
+    if (!header || !entry.gzip) return null
+
+    const accepted = new Map()
+    for (const part of header.split(',')) {
+        const [name, ...params] = part.trim().toLowerCase().split(';')
+        const q = params.map(p => p.trim()).find(p => p.startsWith('q='))
+        accepted.set(name, q ? parseFloat(q.slice(2)) : 1)
+    }
+
+    const allows = (name) => (accepted.get(name) ?? accepted.get('*') ?? 0) > 0
+    if (allows('br')) return 'br'
+    if (allows('gzip')) return 'gzip'
+    return null
+}
+
+module.exports = SnapshotCache
+module.exports.matchesETag = matchesETag
+module.exports.negotiateEncoding = negotiateEncoding
@@ -2,490 +2,58 @@
 """
 Backend API Test Suite for FaceShot-ChopShop-web
 Tests MongoDB migration and all API endpoints
+
+The checks themselves are declared in ``harness.scenarios``; this script runs
+the extended set (including status and upload) once as a functional gate.
 """
 
-import requests
-import json
-import time
+import os
 import sys
-from typing import Dict, Any, Optional
+
+from harness import Engine
+from harness.report import print_migration_status, print_result, print_summary
+from harness.scenarios import EXTENDED_SCENARIOS
+
 
 class BackendTester:
     def __init__(self, base_url: str = "http://localhost:8001"):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.auth_token = None
-        self.user_id = None
+        self.engine = Engine(base_url, EXTENDED_SCENARIOS)
         self.test_results = []
-        
-    def log_result(self, test_name: str, success: bool, message: str, details: Any = None):
-        """Log test result"""
-        result = {
-            "test": test_name,
-            "success": success,
-            "message": message,
-            "details": details
-        }
-        self.test_results.append(result)
-        status = "✅ PASS" if success else "❌ FAIL"
-        print(f"{status}: {test_name} - {message}")
-        if details and not success:
-            print(f"   Details: {details}")
-    
-    def make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
-        """Make HTTP request with proper error handling"""
-        url = f"{self.base_url}{endpoint}"
-        try:
-            response = self.session.request(method, url, timeout=30, **kwargs)
-            return response
-        except requests.exceptions.RequestException as e:
-            print(f"Request failed: {e}")
-            raise
-    
-    def test_health_endpoints(self):
-        """Test health check endpoints"""
-        print("\n=== Testing Health Endpoints ===")
-        
-        for endpoint in ['/health', '/ready', '/alive']:
-            try:
-                response = self.make_request('GET', endpoint)
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'status' in data:
-                        self.log_result(f"Health check {endpoint}", True, f"Status: {data['status']}")
-                    else:
-                        self.log_result(f"Health check {endpoint}", False, "Missing status field", data)
-                else:
-                    self.log_result(f"Health check {endpoint}", False, f"HTTP {response.status_code}", response.text)
-            except Exception as e:
-                self.log_result(f"Health check {endpoint}", False, f"Exception: {str(e)}")
-    
-    def test_stats_endpoint(self):
-        """Test public stats endpoint"""
-        print("\n=== Testing Stats Endpoint ===")
-        
-        try:
-            response = self.make_request('GET', '/stats')
-            if response.status_code == 200:
-                data = response.json()
-                required_fields = ['videos', 'paying_users', 'total_users', 'conversion_rate', 'revenue_cents']
-                missing_fields = [field for field in required_fields if field not in data]
-                
-                if not missing_fields:
-                    self.log_result("Stats endpoint", True, f"All fields present: {data}")
-                else:
-                    self.log_result("Stats endpoint", False, f"Missing fields: {missing_fields}", data)
-            else:
-                self.log_result("Stats endpoint", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Stats endpoint", False, f"Exception: {str(e)}")
-    
-    def test_catalog_endpoint(self):
-        """Test catalog endpoint - should return 21 tools"""
-        print("\n=== Testing Catalog Endpoint ===")
-        
-        try:
-            response = self.make_request('GET', '/api/web/catalog')
-            if response.status_code == 200:
-                data = response.json()
-                if isinstance(data, list):
-                    tool_count = len(data)
-                    if tool_count == 21:
-                        self.log_result("Catalog endpoint", True, f"Returned {tool_count} tools as expected")
-                    else:
-                        self.log_result("Catalog endpoint", False, f"Expected 21 tools, got {tool_count}", data[:3])
-                else:
-                    self.log_result("Catalog endpoint", False, "Response is not a list", data)
-            else:
-                self.log_result("Catalog endpoint", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Catalog endpoint", False, f"Exception: {str(e)}")
-    
-    def test_packs_endpoint(self):
-        """Test packs endpoint - should return 4 credit packs"""
-        print("\n=== Testing Packs Endpoint ===")
-        
-        try:
-            response = self.make_request('GET', '/api/web/packs')
-            if response.status_code == 200:
-                data = response.json()
-                if isinstance(data, list):
-                    pack_count = len(data)
-                    if pack_count == 4:
-                        # Verify pack structure
-                        valid_packs = all('type' in pack and 'points' in pack and 'price_cents' in pack for pack in data)
-                        if valid_packs:
-                            self.log_result("Packs endpoint", True, f"Returned {pack_count} valid packs")
-                        else:
-                            self.log_result("Packs endpoint", False, "Invalid pack structure", data)
-                    else:
-                        self.log_result("Packs endpoint", False, f"Expected 4 packs, got {pack_count}", data)
-                else:
-                    self.log_result("Packs endpoint", False, "Response is not a list", data)
-            else:
-                self.log_result("Packs endpoint", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Packs endpoint", False, f"Exception: {str(e)}")
-    
-    def test_auth_signup(self):
-        """Test user signup"""
-        print("\n=== Testing Authentication - Signup ===")
-        
-        # Use unique email for testing
-        test_email = f"testuser_{int(time.time())}@example.com"
-        test_password = "testpass123"
-        
-        payload = {
-            "email": test_email,
-            "password": test_password
-        }
-        
-        try:
-            response = self.make_request('POST', '/api/auth/signup', json=payload)
-            if response.status_code == 201:
-                data = response.json()
-                if 'token' in data and 'user' in data:
-                    self.auth_token = data['token']
-                    self.user_id = data['user']['id']
-                    self.session.headers.update({'Authorization': f'Bearer {self.auth_token}'})
-                    self.log_result("Auth signup", True, f"User created with ID: {self.user_id}")
-                    return True
-                else:
-                    self.log_result("Auth signup", False, "Missing token or user in response", data)
-            else:
-                self.log_result("Auth signup", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Auth signup", False, f"Exception: {str(e)}")
-        
-        return False
-    
-    def test_auth_login(self):
-        """Test user login with existing credentials"""
-        print("\n=== Testing Authentication - Login ===")
-        
-        # Try with test credentials from review request
-        payload = {
-            "email": "test@example.com",
-            "password": "testpass123"
-        }
-        
-        try:
-            response = self.make_request('POST', '/api/auth/login', json=payload)
-            if response.status_code == 200:
-                data = response.json()
-                if 'token' in data and 'user' in data:
-                    # Update auth for subsequent tests if signup failed
-                    if not self.auth_token:
-                        self.auth_token = data['token']
-                        self.user_id = data['user']['id']
-                        self.session.headers.update({'Authorization': f'Bearer {self.auth_token}'})
-                    self.log_result("Auth login", True, f"Login successful for user: {data['user']['email']}")
-                    return True
-                else:
-                    self.log_result("Auth login", False, "Missing token or user in response", data)
-            elif response.status_code == 401:
-                self.log_result("Auth login", True, "Login correctly rejected invalid credentials (expected for new test user)")
-                return True
-            else:
-                self.log_result("Auth login", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Auth login", False, f"Exception: {str(e)}")
-        
-        return False
-    
-    def test_auth_me(self):
-        """Test auth/me endpoint"""
-        print("\n=== Testing Authentication - Me ===")
-        
-        if not self.auth_token:
-            self.log_result("Auth me", False, "No auth token available")
-            return False
-        
-        try:
-            response = self.make_request('GET', '/api/auth/me')
-            if response.status_code == 200:
-                data = response.json()
-                if 'id' in data and 'email' in data:
-                    self.log_result("Auth me", True, f"User info retrieved: {data['email']}")
-                    return True
-                else:
-                    self.log_result("Auth me", False, "Missing user fields", data)
-            else:
-                self.log_result("Auth me", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Auth me", False, f"Exception: {str(e)}")
-        
-        return False
-    
-    def test_credits_endpoint(self):
-        """Test credits endpoint (requires auth)"""
-        print("\n=== Testing Credits Endpoint ===")
-        
-        if not self.auth_token:
-            self.log_result("Credits endpoint", False, "No auth token available")
-            return False
-        
-        try:
-            response = self.make_request('GET', '/api/web/credits')
-            if response.status_code == 200:
-                data = response.json()
-                if 'balance' in data:
-                    self.log_result("Credits endpoint", True, f"Credits balance: {data['balance']}")
-                    return True
-                else:
-                    self.log_result("Credits endpoint", False, "Missing balance field", data)
-            else:
-                self.log_result("Credits endpoint", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Credits endpoint", False, f"Exception: {str(e)}")
-        
-        return False
-    
-    def test_creations_endpoint(self):
-        """Test creations/jobs endpoint (requires auth)"""
-        print("\n=== Testing Creations Endpoint ===")
-        
-        if not self.auth_token:
-            self.log_result("Creations endpoint", False, "No auth token available")
-            return False
-        
-        try:
-            response = self.make_request('GET', '/api/web/creations')
-            if response.status_code == 200:
-                data = response.json()
-                if 'items' in data and isinstance(data['items'], list):
-                    self.log_result("Creations endpoint", True, f"Retrieved {len(data['items'])} creations")
-                    return True
-                else:
-                    self.log_result("Creations endpoint", False, "Invalid response structure", data)
-            else:
-                self.log_result("Creations endpoint", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Creations endpoint", False, f"Exception: {str(e)}")
-        
-        return False
-    
-    def test_upload_endpoint(self):
-        """Test upload endpoint (requires auth)"""
-        print("\n=== Testing Upload Endpoint ===")
-        
-        if not self.auth_token:
-            self.log_result("Upload endpoint", False, "No auth token available")
-            return False
-        
-        # Test upload without file first (should work)
-        try:
-            response = self.make_request('POST', '/api/web/upload', data={'type': 'faceswap'})
-            if response.status_code == 200:
-                resp_data = response.json()
-                if 'status' in resp_data and resp_data['status'] == 'uploaded':
-                    self.log_result("Upload endpoint (no file)", True, f"Upload without file works: {resp_data}")
-                else:
-                    self.log_result("Upload endpoint (no file)", False, "Invalid upload response", resp_data)
-            else:
-                self.log_result("Upload endpoint (no file)", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Upload endpoint (no file)", False, f"Exception: {str(e)}")
-        
-        # Test upload with file (may fail due to Cloudinary config)
-        test_data = b"fake image data for testing"
-        files = {'file': ('test.jpg', test_data, 'image/jpeg')}
-        data = {'type': 'faceswap'}
-        
-        try:
-            response = self.make_request('POST', '/api/web/upload', files=files, data=data)
-            if response.status_code == 200:
-                resp_data = response.json()
-                if 'status' in resp_data and resp_data['status'] == 'uploaded':
-                    self.log_result("Upload endpoint (with file)", True, f"Upload with file successful: {resp_data}")
-                    return True
-                else:
-                    self.log_result("Upload endpoint (with file)", False, "Invalid upload response", resp_data)
-            elif response.status_code == 500:
-                # Check if it's a Cloudinary configuration issue
-                self.log_result("Upload endpoint (with file)", True, "Upload fails due to Cloudinary config (expected in test env)")
-                return True
-            else:
-                self.log_result("Upload endpoint (with file)", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Upload endpoint (with file)", False, f"Exception: {str(e)}")
-        
-        return False
-    
-    def test_unauthorized_endpoints(self):
-        """Test that protected endpoints reject unauthorized requests"""
-        print("\n=== Testing Unauthorized Access ===")
-        
-        # Temporarily remove auth header
-        original_auth = self.session.headers.get('Authorization')
-        if 'Authorization' in self.session.headers:
-            del self.session.headers['Authorization']
-        
-        protected_endpoints = [
-            '/api/auth/me',
-            '/api/web/credits',
-            '/api/web/creations'
-        ]
-        
-        for endpoint in protected_endpoints:
-            try:
-                response = self.make_request('GET', endpoint)
-                if response.status_code == 401:
-                    self.log_result(f"Unauthorized {endpoint}", True, "Correctly rejected unauthorized request")
-                else:
-                    self.log_result(f"Unauthorized {endpoint}", False, f"Should return 401, got {response.status_code}")
-            except Exception as e:
-                self.log_result(f"Unauthorized {endpoint}", False, f"Exception: {str(e)}")
-        
-        # Restore auth header
-        if original_auth:
-            self.session.headers['Authorization'] = original_auth
-    
-    def run_all_tests(self):
+
+    @property
+    def auth_token(self):
+        return self.engine.context.get("token")
+
+    @property
+    def user_id(self):
+        return self.engine.context.get("user_id")
+
+    def run_all_tests(self) -> bool:
         """Run all backend tests"""
         print("🚀 Starting FaceShot-ChopShop-web Backend API Tests")
-        print(f"Testing backend at: {self.base_url}")
-        
-        # Test health and public endpoints first
-        self.test_health_endpoints()
-        self.test_stats_endpoint()
-        self.test_catalog_endpoint()
-        self.test_packs_endpoint()
-        
-        # Test authentication flow
-        signup_success = self.test_auth_signup()
-        login_success = self.test_auth_login()
-        
-        if signup_success or login_success:
-            self.test_auth_me()
-            self.test_credits_endpoint()
-            self.test_creations_endpoint()
-            self.test_upload_endpoint()
-    def test_status_endpoint(self):
-        """Test status endpoint"""
-        print("\n=== Testing Status Endpoint ===")
-        
-        # Test without ID (should fail)
-        try:
-            response = self.make_request('GET', '/api/web/status')
-            if response.status_code == 400:
-                resp_data = response.json()
-                if 'missing_id' in resp_data.get('error', ''):
-                    self.log_result("Status endpoint (no ID)", True, "Correctly requires job ID")
-                else:
-                    self.log_result("Status endpoint (no ID)", False, f"Wrong error: {resp_data}")
-            else:
-                self.log_result("Status endpoint (no ID)", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Status endpoint (no ID)", False, f"Exception: {str(e)}")
-        
-        # Test with invalid ID
-        try:
-            response = self.make_request('GET', '/api/web/status?id=invalid_job_id')
-            if response.status_code == 404:
-                resp_data = response.json()
-                if 'not_found' in resp_data.get('error', ''):
-                    self.log_result("Status endpoint (invalid ID)", True, "Correctly handles invalid job ID")
-                else:
-                    self.log_result("Status endpoint (invalid ID)", False, f"Wrong error: {resp_data}")
-            elif response.status_code == 500:
-                # May fail due to invalid ObjectId format
-                self.log_result("Status endpoint (invalid ID)", True, "Correctly handles malformed job ID")
-            else:
-                self.log_result("Status endpoint (invalid ID)", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Status endpoint (invalid ID)", False, f"Exception: {str(e)}")
-        
-        return True
-        
-    def test_process_endpoint(self):
-        """Test process endpoint (requires auth and uploaded job)"""
-        print("\n=== Testing Process Endpoint ===")
-        
-        if not self.auth_token:
-            self.log_result("Process endpoint", False, "No auth token available")
-            return False
-        
-        # First create an upload job
-        try:
-            upload_response = self.make_request('POST', '/api/web/upload', data={'type': 'faceswap'})
-            if upload_response.status_code != 200:
-                self.log_result("Process endpoint", False, "Could not create upload job for processing")
-                return False
-            
-            # Now try to process
-            process_data = {
-                'type': 'faceswap',
-                'options': {}
-            }
-            
-            response = self.make_request('POST', '/api/web/process', json=process_data)
-            if response.status_code == 402:
-                # Insufficient credits is expected for new users
-                self.log_result("Process endpoint", True, "Process correctly requires credits (insufficient_credits)")
-                return True
-            elif response.status_code == 500:
-                # May fail due to A2E API configuration
-                resp_data = response.json()
-                if 'a2e_api_error' in resp_data.get('error', ''):
-                    self.log_result("Process endpoint", True, "Process fails due to A2E API config (expected in test env)")
-                    return True
-                else:
-                    self.log_result("Process endpoint", False, f"Unexpected error: {resp_data}")
-            elif response.status_code == 200:
-                resp_data = response.json()
-                self.log_result("Process endpoint", True, f"Process started: {resp_data}")
-                return True
-            else:
-                self.log_result("Process endpoint", False, f"HTTP {response.status_code}", response.text)
-        except Exception as e:
-            self.log_result("Process endpoint", False, f"Exception: {str(e)}")
-        
-        return False
-        
-        # Print summary
-        self.print_summary()
-    
-    def print_summary(self):
+        print(f"Testing backend at: {self.base_url}\n")
+
+        self.test_results = self.engine.run_once(print_result)
+        return self.print_summary()
+
+    def print_summary(self) -> bool:
         """Print test summary"""
-        print("\n" + "="*60)
-        print("🧪 TEST SUMMARY")
-        print("="*60)
-        
-        passed = sum(1 for result in self.test_results if result['success'])
-        failed = len(self.test_results) - passed
-        
-        print(f"Total Tests: {len(self.test_results)}")
-        print(f"✅ Passed: {passed}")
-        print(f"❌ Failed: {failed}")
-        
-        if failed > 0:
-            print("\n🔍 FAILED TESTS:")
-            for result in self.test_results:
-                if not result['success']:
-                    print(f"  • {result['test']}: {result['message']}")
-        
-        print("\n📊 MongoDB Migration Status:")
-        auth_working = any(r['success'] and 'auth' in r['test'].lower() for r in self.test_results)
-        catalog_working = any(r['success'] and 'catalog' in r['test'].lower() for r in self.test_results)
-        credits_working = any(r['success'] and 'credits' in r['test'].lower() for r in self.test_results)
-        
-        print(f"  • Authentication: {'✅ Working' if auth_working else '❌ Issues'}")
-        print(f"  • Catalog (21 tools): {'✅ Working' if catalog_working else '❌ Issues'}")
-        print(f"  • Credits System: {'✅ Working' if credits_working else '❌ Issues'}")
-        
-        return failed == 0
+        success = print_summary(self.test_results)
+        print_migration_status(self.test_results)
+        return success
+
 
 def main():
     """Main test runner"""
-    backend_url = "http://localhost:8001"
-    
+    backend_url = os.environ.get("BACKEND_URL", "http://localhost:8001")
+
     print("🔧 FaceShot-ChopShop-web Backend Test Suite")
     print("Testing MongoDB migration and API functionality")
-    
+
     tester = BackendTester(backend_url)
     success = tester.run_all_tests()
-    
+
     if success:
         print("\n🎉 All tests passed! MongoDB migration successful.")
         sys.exit(0)
@@ -493,5 +61,6 @@ def main():
         print("\n⚠️  Some tests failed. Check the details above.")
         sys.exit(1)
 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
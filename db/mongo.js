@@ -138,6 +138,30 @@ class MongoDatabase {
         return credits.balance;
     }
 
+    // Conditional $inc so the balance check and the debit happen in one
+    // atomic round trip; returns the new balance, or null if it was too low
+    async reserveCredits(userId, amount) {
+        const credits = await UserCredits.findOneAndUpdate(
+            { user_id: userId, balance: { $gte: amount } },
+            { $inc: { balance: -amount }, $set: { updated_at: new Date() } },
+            { new: true }
+        );
+
+        return credits ? credits.balance : null;
+    }
+
+    // Atomic counterpart of reserveCredits for handing a reservation back;
+    // $inc never overwrites a debit made concurrently
+    async releaseCredits(userId, amount) {
+        const credits = await UserCredits.findOneAndUpdate(
+            { user_id: userId },
+            { $inc: { balance: amount }, $set: { updated_at: new Date() } },
+            { new: true }
+        );
+
+        return credits ? credits.balance : null;
+    }
+
     // Job operations
     async createJob(userId, type, sourceUrl, options = {}, targetUrl = null, orderId = null) {
         const job = await Job.create({
@@ -150,8 +174,7 @@ class MongoDatabase {
             order_id: orderId
         });
 
-        // Update stats
-        await Stats.updateOne({}, { $inc: { total_jobs: 1 } });
+        await this.incrementJobStats(1);
 
         return {
             id: job._id.toString(),
@@ -166,6 +189,61 @@ class MongoDatabase {
         };
     }
 
+    // Bulk variant of createJob: one insert and one stats update for the batch.
+    // An ordered insertMany can stop part way, so on failure the error carries
+    // insertedJobs, aligned with optionsList (null where nothing was written),
+    // or null if even that could not be determined.
+    async createJobs(userId, type, optionsList) {
+        const docs = optionsList.map(options => ({
+            _id: new mongoose.Types.ObjectId(),
+            user_id: userId,
+            type,
+            status: 'pending',
+            options
+        }));
+
+        let jobs;
+        try {
+            jobs = await Job.insertMany(docs);
+        } catch (error) {
+            try {
+                const inserted = await Job.find({ _id: { $in: docs.map(doc => doc._id) } });
+                const byId = new Map(inserted.map(job => [job._id.toString(), job]));
+                error.insertedJobs = docs.map(doc => {
+                    const job = byId.get(doc._id.toString());
+                    return job ? this.toBatchJob(job, userId) : null;
+                });
+            } catch (lookupError) {
+                error.insertedJobs = null;
+            }
+            throw error;
+        }
+
+        await this.incrementJobStats(jobs.length);
+
+        return jobs.map(job => this.toBatchJob(job, userId));
+    }
+
+    toBatchJob(job, userId) {
+        return {
+            id: job._id.toString(),
+            user_id: userId,
+            type: job.type,
+            status: job.status,
+            options: job.options,
+            created_at: job.created_at
+        };
+    }
+
+    // The counter is cosmetic: a failed bump must not fail a job that exists
+    async incrementJobStats(count) {
+        try {
+            await Stats.updateOne({}, { $inc: { total_jobs: count } });
+        } catch (error) {
+            console.warn('Job stats update failed:', error.message);
+        }
+    }
+
     async updateJob(jobId, updates) {
         const job = await Job.findById(jobId);
         if (!job) throw new Error('Job not found');
@@ -192,6 +270,33 @@ class MongoDatabase {
         };
     }
 
+    // Moves a job that has not finished yet to 'failed' or 'cancelled'. Only
+    // one caller can win that transition, so a job is refunded at most once.
+    // Returns null when nothing changed.
+    async settleJob(jobId, updates) {
+        const job = await Job.findOneAndUpdate(
+            { _id: jobId, status: { $nin: ['failed', 'completed', 'cancelled'] } },
+            { $set: { ...updates, updated_at: new Date() } },
+            { new: true }
+        );
+        if (!job) return null;
+
+        return {
+            id: job._id.toString(),
+            user_id: job.user_id.toString(),
+            status: job.status,
+            options: job.options
+        };
+    }
+
+    async failJob(jobId, errorMessage) {
+        return await this.settleJob(jobId, { status: 'failed', error: errorMessage });
+    }
+
+    async cancelJob(jobId) {
+        return await this.settleJob(jobId, { status: 'cancelled' });
+    }
+
     async getJob(jobId) {
         const job = await Job.findById(jobId);
         if (!job) return null;
@@ -510,12 +615,13 @@ class MongoDatabase {
     }
 
     // Job Steps operations
-    async createJobStep(jobId, stepOrder, toolType, inputData = {}) {
+    async createJobStep(jobId, stepOrder, toolType, inputData = {}, fields = {}) {
         return await JobStep.create({
             job_id: jobId,
             step_order: stepOrder,
             tool_type: toolType,
-            input_data: inputData
+            input_data: inputData,
+            ...fields
         });
     }
 
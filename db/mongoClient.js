@@ -30,6 +30,13 @@ const {
 
 let isConnected = false;
 
+// Driver-level command counters; each started command is one DB round trip
+const commandStats = {
+    started: 0,
+    succeeded: 0,
+    failed: 0
+};
+
 /**
  * Connect to MongoDB Atlas using Mongoose
  * Connection is created once and reused
@@ -50,8 +57,14 @@ const connectDB = async () => {
         await mongoose.connect(uri, {
             dbName: dbName || undefined, // Use dbName if provided, otherwise let URI handle it
             serverSelectionTimeoutMS: 5000,
+            monitorCommands: true,
         });
 
+        const client = mongoose.connection.getClient();
+        client.on('commandStarted', () => { commandStats.started++; });
+        client.on('commandSucceeded', () => { commandStats.succeeded++; });
+        client.on('commandFailed', () => { commandStats.failed++; });
+
         isConnected = true;
         console.log('✅ MongoDB connected successfully via mongoClient');
         return mongoose.connection.db;
@@ -104,6 +117,13 @@ const getDB = () => {
     return mongoose.connection.db;
 };
 
+/**
+ * Snapshot of the command counters since the connection was opened
+ */
+const getCommandStats = () => {
+    return { ...commandStats };
+};
+
 /**
  * Close the database connection
  */
@@ -119,5 +139,6 @@ module.exports = {
     connectDB,
     getCollections,
     getDB,
+    getCommandStats,
     closeDB
 };
\ No newline at end of file
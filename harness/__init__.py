@@ -0,0 +1,21 @@
+"""
+Scenario harness for the FaceShot-ChopShop-web backend.
+
+Checks are declared once as data in ``harness.scenarios`` and compiled by
+``harness.engine`` into a runner that can execute them a single time as a
+functional gate or repeatedly as a load driver.
+"""
+
+from .engine import Engine, LoadReport, Result, compile_scenarios
+from .scenarios import AUTH_NONE, AUTH_TOKEN, SCENARIOS, Scenario
+
+__all__ = [
+    "AUTH_NONE",
+    "AUTH_TOKEN",
+    "Engine",
+    "LoadReport",
+    "Result",
+    "SCENARIOS",
+    "Scenario",
+    "compile_scenarios",
+]
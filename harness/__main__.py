@@ -0,0 +1,57 @@
+"""
+Command line entry point.
+
+    python -m harness functional [--extended]
+    python -m harness load --duration 30 --concurrency 16 [--tag public]
+"""
+
+import argparse
+import json
+import sys
+
+from .engine import DEFAULT_BASE_URL, Engine
+from .report import print_result, print_summary
+from .scenarios import EXTENDED_SCENARIOS, SCENARIOS
+
+
+def run_functional(base_url: str, extended: bool = False) -> bool:
+    print("🚀 Testing FaceShot-ChopShop-web Backend API")
+    print(f"Backend URL: {base_url}\n")
+    engine = Engine(base_url, EXTENDED_SCENARIOS if extended else SCENARIOS)
+    results = engine.run_once(print_result)
+    return print_summary(results)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    functional = sub.add_parser("functional", help="run every scenario once")
+    functional.add_argument("--extended", action="store_true", help="include status and upload scenarios")
+
+    load = sub.add_parser("load", help="replay scenarios for a fixed duration")
+    load.add_argument("--duration", type=float, default=10.0)
+    load.add_argument("--concurrency", type=int, default=8)
+    load.add_argument("--tag", action="append", default=[],
+                      help="only replay scenarios carrying this tag (repeatable)")
+
+    args = parser.parse_args(argv)
+
+    if args.mode == "functional":
+        return 0 if run_functional(args.base_url, args.extended) else 1
+
+    engine = Engine(args.base_url, SCENARIOS)
+    plan = [c for c, s in zip(engine.compiled, SCENARIOS)
+            if not args.tag or set(args.tag) & set(s.tags)]
+    if not plan:
+        print(f"No scenarios match tags {args.tag}", file=sys.stderr)
+        return 2
+
+    report = engine.run_load(args.duration, args.concurrency, plan)
+    print(json.dumps(report.as_dict(), indent=2))
+    return 0 if report.failures == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,540 @@
+"""
+Query-plan audit for the MongoDB access paths in ``db/mongo.js``.
+
+Seeds a throwaway local database with production-like volumes, creates the
+indexes declared in ``FaceShot-ChopShop-web/models.js`` and runs
+``explain("executionStats")`` for every registered access path. A path fails
+when its winning plan contains a COLLSCAN or an in-memory SORT, when it
+examines more than ``--max-ratio`` documents per document returned (once at
+least ``--min-examined`` documents were read, so a limit-1 lookup that skips
+a handful of rows is not flagged), or when the seeded sample returns nothing.
+
+The sources are also scanned for queries on the per-user collections: a
+query with no entry in ``ACCESS_PATHS`` fails the audit, and so does an entry
+whose query has gone away. Catalog and singleton collections in
+``REFERENCE_MODELS`` stay small and are not audited.
+
+Writes (``findOneAndUpdate``, ``updateOne``, ...) are explained as the
+equivalent ``find``: index selection depends only on the filter and sort.
+
+    python -m harness.audit_query_plans                  # seed, explain, report
+    python -m harness.audit_query_plans --static         # source scan only, no MongoDB
+    python -m harness.audit_query_plans --reuse --json   # keep existing seed data
+
+Needs ``pymongo`` and a MongoDB at ``AUDIT_MONGODB_URI`` (default
+``mongodb://localhost:27017``). The audit database is dropped and recreated;
+with ``--reuse`` the data is kept but every index is rebuilt from models.js.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+from .engine import Result
+from .report import print_result, print_summary
+
+ROOT = Path(__file__).resolve().parents[1]
+MODELS_FILE = ROOT / "FaceShot-ChopShop-web" / "models.js"
+SCANNED_SOURCES = ("db/mongo.js", "FaceShot-ChopShop-web/index.js")
+
+DEFAULT_URI = os.environ.get("AUDIT_MONGODB_URI", "mongodb://localhost:27017")
+DEFAULT_DB = "faceshot_query_audit"
+
+# Small, admin-managed or single-document collections
+REFERENCE_MODELS = frozenset({
+    "Stats", "Vector", "Plan", "Sku", "Flag", "SkuToolConfig", "SkuToolStep",
+    "SkuCustomerOption", "SchemaMigration",
+})
+
+JOB_TYPES = ("faceswap", "img2vid", "talking_photo", "avatar_video", "voice_clone", "enhance")
+PLAN_IDS = ("starter", "pro", "business")
+
+# Row counts at --scale 1.0
+VOLUMES = {
+    "users": 20_000,
+    "jobs": 200_000,
+    "subscribers": 4_000,
+    "orders": 40_000,
+    "miniapp_creations": 30_000,
+    "processed_events": 50_000,
+}
+
+QUERY_OPS = (
+    "find", "findOne", "findOneAndUpdate", "findOneAndDelete", "countDocuments",
+    "updateOne", "updateMany", "deleteOne", "deleteMany", "aggregate", "distinct",
+)
+
+
+@dataclass(frozen=True)
+class AccessPath:
+    source: str
+    caller: str  # db/mongo.js method, or "METHOD /path" for an index.js route
+    model: str
+    op: str
+    # Builds the query filter from the sample values picked while seeding
+    filter: Callable[[Dict[str, Any]], Dict[str, Any]]
+    sort: Tuple[Tuple[str, int], ...] = ()
+    limit: int = 0
+
+    @property
+    def key(self) -> Tuple[str, str, str, str]:
+        return (self.source, self.caller, self.model, self.op)
+
+    @property
+    def name(self) -> str:
+        return f"{self.caller} ({self.model}.{self.op})"
+
+
+def _credits(s):
+    return {"user_id": s["user_id"]}
+
+
+def _period(s):
+    return {
+        "user_id": s["subscriber_id"],
+        "plan_id": s["plan_id"],
+        "period_start": s["period_start"],
+        "period_end": s["period_end"],
+    }
+
+
+def _event(s):
+    return {"event_id": s["event_id"]}
+
+
+ACCESS_PATHS = (
+    AccessPath("db/mongo.js", "getUserByEmail", "User", "findOne", lambda s: {"email": s["email"]}),
+    AccessPath("db/mongo.js", "getCredits", "UserCredits", "findOne", _credits),
+    AccessPath("db/mongo.js", "addCredits", "UserCredits", "findOne", _credits),
+    AccessPath("db/mongo.js", "deductCredits", "UserCredits", "findOne", _credits),
+    AccessPath("db/mongo.js", "reserveCredits", "UserCredits", "findOneAndUpdate",
+               lambda s: {"user_id": s["user_id"], "balance": {"$gte": 90}}),
+    AccessPath("db/mongo.js", "releaseCredits", "UserCredits", "findOneAndUpdate", _credits),
+    AccessPath("db/mongo.js", "createJobs", "Job", "find", lambda s: {"_id": {"$in": [s["job_id"]]}}),
+    AccessPath("db/mongo.js", "settleJob", "Job", "findOneAndUpdate",
+               lambda s: {"_id": s["job_id"], "status": {"$nin": ["failed", "completed", "cancelled"]}}),
+    AccessPath("db/mongo.js", "getUserJobs", "Job", "find",
+               lambda s: {"user_id": s["user_id"]}, sort=(("created_at", -1),), limit=50),
+    AccessPath("db/mongo.js", "getPendingJobs", "Job", "find",
+               lambda s: {
+                   "status": {"$in": ["pending", "processing"]},
+                   "a2e_task_id": {"$exists": True, "$ne": None},
+               },
+               limit=100),
+    AccessPath("db/mongo.js", "getUserActivePlan", "UserPlan", "findOne",
+               lambda s: {
+                   "user_id": s["subscriber_id"],
+                   "status": "active",
+                   "start_date": {"$lte": s["now"]},
+                   "$or": [{"end_date": None}, {"end_date": {"$gt": s["now"]}}],
+               },
+               sort=(("start_date", -1),)),
+    AccessPath("db/mongo.js", "getCurrentPeriodUsage", "PlanUsage", "findOne", _period),
+    AccessPath("db/mongo.js", "createOrUpdatePlanUsage", "PlanUsage", "findOne", _period),
+    AccessPath("db/mongo.js", "deductUsage", "PlanUsage", "findOne", _period),
+    AccessPath("db/mongo.js", "getUserOrders", "Order", "find",
+               lambda s: {"user_id": s["user_id"]}, sort=(("created_at", -1),), limit=50),
+    AccessPath("db/mongo.js", "getLatestMiniappCreation", "MiniappCreation", "findOne",
+               lambda s: {"user_id": s["user_id"], "type": s["type"]}, sort=(("created_at", -1),)),
+    AccessPath("db/mongo.js", "getJobSteps", "JobStep", "find",
+               lambda s: {"job_id": s["job_id"]}, sort=(("step_order", 1),)),
+    AccessPath("db/mongo.js", "getProcessedEvent", "ProcessedEvent", "findOne", _event),
+    AccessPath("FaceShot-ChopShop-web/index.js", "POST /webhook/stripe", "ProcessedEvent", "findOne", _event),
+    AccessPath("FaceShot-ChopShop-web/index.js", "POST /api/web/process", "Job", "findOne",
+               lambda s: {
+                   "user_id": s["user_id"],
+                   "type": s["type"],
+                   "source_url": {"$exists": True, "$ne": None},
+               },
+               sort=(("created_at", -1),)),
+)
+
+
+# ---------------------------------------------------------------------------
+# Source parsing
+# ---------------------------------------------------------------------------
+
+MODEL_RE = re.compile(r"mongoose\.model\('(\w+)',\s*(\w+)\)")
+SCHEMA_RE = re.compile(r"const (\w+) = new mongoose\.Schema\(\{(.*?)\n\}", re.S)
+FIELD_INDEX_RE = re.compile(r"^\s*(\w+):\s*\{[^\n]*\b(unique|index):\s*true", re.M)
+SCHEMA_INDEX_RE = re.compile(r"(\w+)\.index\((\{[^}]*\})(?:\s*,\s*(\{[^}]*\}))?\)")
+PAIR_RE = re.compile(r"(\w+):\s*(-?\d+|true|false)")
+SCOPE_RE = re.compile(
+    r"^(?:    async (\w+)\(|app\.(get|post|put|patch|delete)\('([^']+)'"
+    r"|const (\w+) = async|(?:async )?function (\w+))"
+)
+QUERY_RE = re.compile(r"\b([A-Z]\w*)\.(" + "|".join(QUERY_OPS) + r")\(")
+
+IndexSpec = Tuple[Tuple[Tuple[str, int], ...], bool]
+
+
+def collection_name(model: str) -> str:
+    # Mongoose's default pluralisation for the model names used here
+    name = model.lower()
+    return name if name.endswith("s") else name + "s"
+
+
+def declared_indexes(text: str) -> Dict[str, List[IndexSpec]]:
+    """Map model name -> indexes declared for its schema in models.js."""
+    schema_models = {schema: model for model, schema in MODEL_RE.findall(text)}
+    indexes: Dict[str, List[IndexSpec]] = {model: [] for model in schema_models.values()}
+
+    for schema, body in SCHEMA_RE.findall(text):
+        model = schema_models.get(schema)
+        if model is None:
+            continue
+        for field_name, kind in FIELD_INDEX_RE.findall(body):
+            indexes[model].append((((field_name, 1),), kind == "unique"))
+
+    for schema, keys, options in SCHEMA_INDEX_RE.findall(text):
+        model = schema_models.get(schema)
+        if model is None:
+            continue
+        spec = tuple((name, int(value)) for name, value in PAIR_RE.findall(keys))
+        unique = ("unique", "true") in PAIR_RE.findall(options or "")
+        indexes[model].append((spec, unique))
+
+    return indexes
+
+
+def scan_queries(root: Path, models: Iterable[str]) -> Set[Tuple[str, str, str, str]]:
+    """Return ``(source, caller, model, op)`` for every query in the scanned sources."""
+    models = set(models)
+    found = set()
+    for source in SCANNED_SOURCES:
+        caller = "<module>"
+        for line in (root / source).read_text(encoding="utf-8").splitlines():
+            scope = SCOPE_RE.match(line)
+            if scope:
+                method, verb, route, const_fn, function = scope.groups()
+                caller = method or const_fn or function or f"{verb.upper()} {route}"
+            for model, op in QUERY_RE.findall(line):
+                if model in models:
+                    found.add((source, caller, model, op))
+    return found
+
+
+def registry_results(found: Set[Tuple[str, str, str, str]]) -> List[Result]:
+    registered = {path.key for path in ACCESS_PATHS}
+    audited = {key for key in found if key[2] not in REFERENCE_MODELS}
+    results = []
+
+    for source, caller, model, op in sorted(audited - registered):
+        results.append(Result(
+            name=f"Unaudited query {caller} ({model}.{op})",
+            success=False,
+            status=0,
+            elapsed_ms=0.0,
+            message=f"{source} queries {model} with no entry in ACCESS_PATHS",
+            details="register it with a sample filter and make sure models.js declares a supporting index",
+        ))
+    for source, caller, model, op in sorted(registered - found):
+        results.append(Result(
+            name=f"Stale access path {caller} ({model}.{op})",
+            success=False,
+            status=0,
+            elapsed_ms=0.0,
+            message=f"no longer found in {source}",
+            details="remove or update the ACCESS_PATHS entry",
+        ))
+    if not results:
+        results.append(Result(
+            name="Access path registry",
+            success=True,
+            status=0,
+            elapsed_ms=0.0,
+            message=f"{len(audited)} queries on per-user collections, all registered",
+        ))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Seeding
+# ---------------------------------------------------------------------------
+
+def _insert(collection, docs: Iterable[Dict[str, Any]], chunk: int = 5_000):
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == chunk:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+
+
+def _owner(rng: random.Random, user_ids: List[Any]) -> Any:
+    # Cubing skews ownership towards the front of the list, so a few heavy
+    # users own most rows like real accounts do; user_ids[0] is the heaviest
+    return user_ids[int(len(user_ids) * rng.random() ** 3)]
+
+
+def seed(db, scale: float, rng: random.Random) -> Dict[str, Any]:
+    """Fill the audit database and return sample values for the filters."""
+    from bson import ObjectId
+
+    volumes = {name: max(10, int(count * scale)) for name, count in VOLUMES.items()}
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    ago = lambda days: now - timedelta(seconds=rng.randint(0, days * 86_400))
+
+    user_ids = [ObjectId() for _ in range(volumes["users"])]
+    _insert(db.users, (
+        {"_id": uid, "email": f"user{i}@example.com", "password_hash": "x",
+         "created_at": ago(365), "updated_at": now}
+        for i, uid in enumerate(user_ids)
+    ))
+    _insert(db.usercredits, (
+        {"user_id": uid, "balance": 5_000 if i == 0 else rng.randint(0, 500), "updated_at": now}
+        for i, uid in enumerate(user_ids)
+    ))
+
+    job_ids = []
+
+    def jobs():
+        for n in range(volumes["jobs"]):
+            roll = rng.random()
+            status = ("completed" if roll < 0.88 else "failed" if roll < 0.94
+                      else "processing" if roll < 0.97 else "pending")
+            job_id = ObjectId()
+            job_ids.append(job_id)
+            doc = {
+                "_id": job_id,
+                "user_id": _owner(rng, user_ids),
+                "type": rng.choice(JOB_TYPES),
+                "status": status,
+                "options": {},
+                "created_at": ago(180),
+                "updated_at": now,
+            }
+            # Pending jobs only get an A2E task once a worker picks them up
+            if status != "pending" or rng.random() < 0.5:
+                doc["a2e_task_id"] = f"task_{n}"
+            if rng.random() < 0.7:
+                doc["source_url"] = f"https://res.cloudinary.com/demo/{n}.jpg"
+            if status == "completed":
+                doc["result_url"] = f"https://cdn.example.com/results/{n}.mp4"
+            yield doc
+
+    _insert(db.jobs, jobs())
+    stepped_jobs = job_ids[:: 10]
+    _insert(db.jobsteps, (
+        {"job_id": job_id, "step_order": order, "tool_type": rng.choice(JOB_TYPES),
+         "status": "completed", "created_at": now}
+        for job_id in stepped_jobs
+        for order in range(rng.randint(2, 4))
+    ))
+
+    subscribers = rng.sample(user_ids, min(volumes["subscribers"], len(user_ids)))
+    periods = []
+    plans = []
+    for uid in subscribers:
+        plan_id = rng.choice(PLAN_IDS)
+        for month in range(6, 0, -1):
+            start = (now - timedelta(days=30 * month)).replace(hour=0, minute=0, second=0)
+            periods.append({
+                "user_id": uid, "plan_id": plan_id, "period_start": start,
+                "period_end": start + timedelta(days=30), "seconds_used": rng.randint(0, 3_600),
+                "created_at": start, "updated_at": now,
+            })
+        history = rng.randint(1, 3)
+        for i in range(history):
+            start = now - timedelta(days=90 * (history - i))
+            current = i == history - 1
+            plans.append({
+                "user_id": uid, "plan_id": plan_id, "start_date": start,
+                "end_date": None if current else start + timedelta(days=90),
+                "status": "active" if current else "cancelled", "created_at": start,
+            })
+    _insert(db.planusages, periods)
+    _insert(db.userplans, plans)
+
+    _insert(db.orders, (
+        {"user_id": _owner(rng, user_ids), "sku_code": f"C1-{rng.choice((15, 30, 60))}",
+         "quantity": 1, "customer_price_cents": 999, "internal_cost_cents": 400,
+         "margin_percent": 0.6, "total_seconds": 30, "status": rng.choice(("pending", "paid", "completed")),
+         "created_at": ago(180)}
+        for _ in range(volumes["orders"])
+    ))
+    _insert(db.miniappcreations, (
+        {"user_id": _owner(rng, user_ids), "type": rng.choice(JOB_TYPES), "status": "done",
+         "url": "https://cdn.example.com/m.mp4", "created_at": ago(180)}
+        for _ in range(volumes["miniapp_creations"])
+    ))
+    _insert(db.processedevents, (
+        {"event_id": f"evt_{i:08d}", "event_type": "checkout.session.completed",
+         "status": "processed", "processed_at": ago(365)}
+        for i in range(volumes["processed_events"])
+    ))
+
+    latest = periods[-1]
+    return {
+        "user_id": user_ids[0],
+        "email": "user0@example.com",
+        "subscriber_id": latest["user_id"],
+        "plan_id": latest["plan_id"],
+        "period_start": latest["period_start"],
+        "period_end": latest["period_end"],
+        "job_id": stepped_jobs[0],
+        "type": JOB_TYPES[0],
+        "event_id": f"evt_{volumes['processed_events'] // 2:08d}",
+        "now": now,
+    }
+
+
+def ensure_indexes(db, indexes: Dict[str, List[IndexSpec]]):
+    # Rebuild from scratch so a --reuse run cannot be served by an index
+    # that models.js no longer declares; drop_indexes keeps _id
+    for name in db.list_collection_names():
+        if name != "meta":
+            db[name].drop_indexes()
+    for model, specs in indexes.items():
+        for keys, unique in specs:
+            db[collection_name(model)].create_index(list(keys), unique=unique)
+
+
+# ---------------------------------------------------------------------------
+# Explain analysis
+# ---------------------------------------------------------------------------
+
+def plan_nodes(node: Dict[str, Any]) -> List[Dict[str, Any]]:
+    nodes, stack = [], [node]
+    while stack:
+        current = stack.pop()
+        nodes.append(current)
+        if "inputStage" in current:
+            stack.append(current["inputStage"])
+        stack.extend(current.get("inputStages", ()))
+    return nodes
+
+
+def analyze(path: AccessPath, explain: Dict[str, Any], max_ratio: float, min_examined: int) -> Result:
+    winning = explain["queryPlanner"]["winningPlan"]
+    # The slot-based engine wraps the classic tree in "queryPlan"
+    nodes = plan_nodes(winning.get("queryPlan", winning))
+    stages = [node["stage"] for node in nodes]
+    index_names = [node["indexName"] for node in nodes if node.get("indexName")]
+
+    stats = explain["executionStats"]
+    returned = stats["nReturned"]
+    docs = stats["totalDocsExamined"]
+    keys = stats["totalKeysExamined"]
+    ratio = docs / max(returned, 1)
+
+    problems = []
+    if "COLLSCAN" in stages:
+        problems.append("COLLSCAN")
+    if "SORT" in stages:
+        problems.append("in-memory SORT")
+    if ratio > max_ratio and docs >= min_examined:
+        problems.append(f"examined {ratio:.1f} docs per doc returned (max {max_ratio:g})")
+    if returned == 0:
+        problems.append("sample returned no documents, so the plan was not exercised")
+
+    details = {
+        "source": path.source,
+        "stages": stages,
+        "indexes": index_names,
+        "keys_examined": keys,
+        "docs_examined": docs,
+        "returned": returned,
+        "docs_per_returned": round(ratio, 2),
+        "problems": problems,
+    }
+    return Result(
+        name=path.name,
+        success=not problems,
+        status=0,
+        elapsed_ms=float(stats.get("executionTimeMillis", 0)),
+        message="; ".join(problems) if problems else
+        f"{'/'.join(index_names) or 'no index'}: {keys} keys, {docs} docs, {returned} returned",
+        details=details,
+    )
+
+
+def explain_path(db, path: AccessPath, sample: Dict[str, Any]) -> Dict[str, Any]:
+    command: Dict[str, Any] = {"find": collection_name(path.model), "filter": path.filter(sample)}
+    if path.sort:
+        command["sort"] = dict(path.sort)
+    limit = path.limit or (1 if path.op.startswith("findOne") else 0)
+    if limit:
+        command["limit"] = limit
+    return db.command("explain", command, verbosity="executionStats")
+
+
+def audit(uri: str, db_name: str, scale: float, max_ratio: float, min_examined: int,
+          reuse: bool, seed_value: int) -> List[Result]:
+    from pymongo import MongoClient
+
+    indexes = declared_indexes(MODELS_FILE.read_text(encoding="utf-8"))
+    results = registry_results(scan_queries(ROOT, indexes))
+
+    client = MongoClient(uri, serverSelectionTimeoutMS=5_000)
+    try:
+        db = client[db_name]
+        rng = random.Random(seed_value)
+        if reuse and db.meta.find_one({"_id": "sample"}):
+            sample = db.meta.find_one({"_id": "sample"})["values"]
+        else:
+            client.drop_database(db_name)
+            sample = seed(db, scale, rng)
+            db.meta.insert_one({"_id": "sample", "values": sample})
+        ensure_indexes(db, indexes)
+
+        for path in ACCESS_PATHS:
+            results.append(analyze(path, explain_path(db, path, sample), max_ratio, min_examined))
+    finally:
+        client.close()
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.audit_query_plans")
+    parser.add_argument("--uri", default=DEFAULT_URI)
+    parser.add_argument("--db", default=DEFAULT_DB, help="audit database; must end in _audit (it is dropped)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the seeded volumes")
+    parser.add_argument("--max-ratio", type=float, default=10.0,
+                        help="largest acceptable docs examined per doc returned")
+    parser.add_argument("--min-examined", type=int, default=100,
+                        help="docs examined below which the ratio is not checked")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the generated data")
+    parser.add_argument("--reuse", action="store_true", help="keep data from a previous run if present")
+    parser.add_argument("--static", action="store_true", help="only check the source scan against ACCESS_PATHS")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.static:
+        indexes = declared_indexes(MODELS_FILE.read_text(encoding="utf-8"))
+        results = registry_results(scan_queries(ROOT, indexes))
+    else:
+        if not args.db.endswith("_audit"):
+            print(f"Refusing to drop {args.db!r}: the audit database name must end in _audit", file=sys.stderr)
+            return 2
+        try:
+            results = audit(args.uri, args.db, args.scale, args.max_ratio, args.min_examined,
+                            args.reuse, args.seed)
+        except ImportError:
+            print("pymongo is required: pip install pymongo", file=sys.stderr)
+            return 2
+
+    if args.json:
+        print(json.dumps([
+            {"name": r.name, "success": r.success, "message": r.message, "details": r.details}
+            for r in results
+        ], indent=2, default=str))
+        return 0 if all(r.success for r in results) else 1
+
+    print("🔎 Auditing MongoDB query plans\n")
+    for result in results:
+        print_result(result)
+    return 0 if print_summary(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Auth storm isolation benchmark.
+
+Probes ``/alive`` latency on its own, then again while worker threads hammer
+signup or login, so the effect of password hashing on unrelated requests is
+visible. The server's ``/metrics`` event-loop lag is captured after each phase;
+that endpoint is admin-only, so pass ``--admin-token`` (or set
+``BENCH_ADMIN_TOKEN``) with the bearer token of an ``ADMIN_EMAILS`` account.
+
+    python -m harness.bench_auth_storm --mode signup --duration 10 --concurrency 16
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .engine import DEFAULT_ADMIN_TOKEN, DEFAULT_BASE_URL, Connection, Engine, ScenarioStats, percentile
+from .scenarios import LOGIN, SIGNUP, TEST_PASSWORD, Scenario
+
+PROBE_HEADERS = {"Accept": "application/json"}
+
+
+def summarize(latencies: List[float], errors: int) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "probes": len(ordered),
+        "errors": errors,
+        "p50_ms": round(percentile(ordered, 50), 2),
+        "p95_ms": round(percentile(ordered, 95), 2),
+        "p99_ms": round(percentile(ordered, 99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+class AliveProber(threading.Thread):
+    """Issues GET /alive every ``interval`` seconds until stopped."""
+
+    def __init__(self, base_url: str, interval: float):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.interval = interval
+        self.latencies: List[float] = []
+        self.errors = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        conn = Connection(self.base_url, timeout=10)
+        try:
+            while not self._stop_event.is_set():
+                started = time.perf_counter()
+                try:
+                    status, _, _ = conn.request("GET", "/alive", None, PROBE_HEADERS)
+                    if status != 200:
+                        self.errors += 1
+                except Exception:
+                    self.errors += 1
+                self.latencies.append((time.perf_counter() - started) * 1000)
+                self._stop_event.wait(self.interval)
+        finally:
+            conn.close()
+
+    def stop(self) -> Dict[str, Any]:
+        self._stop_event.set()
+        self.join()
+        return summarize(self.latencies, self.errors)
+
+
+def fetch_metrics(base_url: str, admin_token: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not admin_token:
+        print("No admin token: skipping /metrics (see --admin-token)", file=sys.stderr)
+        return None
+
+    conn = Connection(base_url, timeout=10)
+    try:
+        headers = dict(PROBE_HEADERS, Authorization=f"Bearer {admin_token}")
+        status, _, raw = conn.request("GET", "/metrics", None, headers)
+        if status != 200:
+            print(f"/metrics answered HTTP {status}", file=sys.stderr)
+            return None
+        return json.loads(raw)
+    except Exception:
+        return None
+    finally:
+        conn.close()
+
+
+def storm_scenario(base_url: str, mode: str) -> Scenario:
+    if mode == "signup":
+        return SIGNUP
+
+    # Login storms need an account that really exists, so create one first
+    email = f"storm_{int(time.time() * 1000)}@example.com"
+    account = Scenario(
+        name="Storm account signup",
+        method="POST",
+        path=SIGNUP.path,
+        expect_status=SIGNUP.expect_status,
+        json={"email": email, "password": TEST_PASSWORD},
+    )
+    result = Engine(base_url, (account,)).run_once()[0]
+    if not result.success:
+        raise RuntimeError(f"could not create storm account: {result.message}")
+
+    return Scenario(
+        name="Auth login (storm)",
+        method=LOGIN.method,
+        path=LOGIN.path,
+        json={"email": email, "password": TEST_PASSWORD},
+        schema={"type": "object", "required": ("token",)},
+        tags=LOGIN.tags,
+    )
+
+
+def run(base_url: str, mode: str, duration: float, concurrency: int,
+        baseline: float, interval: float, admin_token: Optional[str]) -> Dict[str, Any]:
+    prober = AliveProber(base_url, interval)
+    prober.start()
+    time.sleep(baseline)
+    baseline_alive = prober.stop()
+    baseline_metrics = fetch_metrics(base_url, admin_token)
+
+    scenario = storm_scenario(base_url, mode)
+    engine = Engine(base_url, (scenario,), timeout=60)
+
+    prober = AliveProber(base_url, interval)
+    prober.start()
+    load = engine.run_load(duration, concurrency, warmup=False)
+    storm_alive = prober.stop()
+    storm_metrics = fetch_metrics(base_url, admin_token)
+
+    stats: ScenarioStats = load.scenarios[scenario.name]
+    return {
+        "mode": mode,
+        "alive_baseline": baseline_alive,
+        "alive_during_storm": storm_alive,
+        "storm": {
+            "duration_s": round(load.duration_s, 3),
+            "concurrency": concurrency,
+            "rps": round(load.rps, 1),
+            **stats.summary(),
+        },
+        "metrics_baseline": baseline_metrics,
+        "metrics_after_storm": storm_metrics,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.bench_auth_storm")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--admin-token", default=DEFAULT_ADMIN_TOKEN, help="admin bearer token for /metrics")
+    parser.add_argument("--mode", choices=("signup", "login"), default="signup")
+    parser.add_argument("--duration", type=float, default=10.0, help="storm length in seconds")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--baseline", type=float, default=3.0, help="seconds of /alive probing before the storm")
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    args = parser.parse_args(argv)
+
+    report = run(args.base_url, args.mode, args.duration, args.concurrency, args.baseline,
+                 args.probe_interval, args.admin_token)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
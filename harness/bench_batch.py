@@ -0,0 +1,188 @@
+"""
+Batch versus one-at-a-time job submission benchmark.
+
+Submits the same number of jobs twice: once as individual
+``POST /api/jobs/create-advanced`` calls and once through
+``POST /api/jobs/create-batch``. For each phase it reports jobs/sec, request
+latency and DB round trips per job, taken from the ``db_commands`` counters
+on the server's admin-only ``/metrics`` (``--admin-token`` or
+``BENCH_ADMIN_TOKEN``).
+
+Accepted jobs start executing straight away and their writes land in the
+same counters, so point ``--sku`` at a tool config without A2E steps (or a
+stubbed A2E) and a quiet server. Both routes charge credits, so the account
+behind ``--token`` needs at least ``2 * jobs * base_credits``. Without
+``--token`` a fresh account is signed up, and its signup credits only cover
+free SKUs; the run stops with an error as soon as a submission gets 402.
+
+    python -m harness.bench_batch --sku C1-15 --inputs '{"avatar_id": "a1"}' --jobs 500 --batch-size 100
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .bench_auth_storm import fetch_metrics
+from .engine import DEFAULT_ADMIN_TOKEN, DEFAULT_BASE_URL, Connection, Engine, percentile
+from .scenarios import SIGNUP
+
+SINGLE_PATH = "/api/jobs/create-advanced"
+BATCH_PATH = "/api/jobs/create-batch"
+
+
+def _db_commands(base_url: str, admin_token: Optional[str]) -> Optional[int]:
+    metrics = fetch_metrics(base_url, admin_token)
+    if not metrics or "db_commands" not in metrics:
+        return None
+    return metrics["db_commands"]["started"]
+
+
+def _accepted(path: str, status: int, raw: bytes) -> int:
+    if path == SINGLE_PATH:
+        return 1 if status == 200 else 0
+    if status != 201:
+        return 0
+    return json.loads(raw).get("accepted", 0)
+
+
+def run_phase(base_url: str, token: str, path: str, bodies: List[Dict[str, Any]],
+              concurrency: int, jobs: int, admin_token: Optional[str]) -> Dict[str, Any]:
+    headers = {
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {token}",
+    }
+    encoded = iter([json.dumps(body).encode() for body in bodies])
+    lock = threading.Lock()
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    accepted = [0]
+
+    def worker():
+        conn = Connection(base_url, timeout=120)
+        try:
+            while True:
+                with lock:
+                    body = next(encoded, None)
+                if body is None:
+                    return
+                started = time.perf_counter()
+                status, _, raw = conn.request("POST", path, body, headers)
+                elapsed = (time.perf_counter() - started) * 1000
+                count = _accepted(path, status, raw)
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[status] = statuses.get(status, 0) + 1
+                    accepted[0] += count
+        finally:
+            conn.close()
+
+    commands_before = _db_commands(base_url, admin_token)
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+    commands_after = _db_commands(base_url, admin_token)
+
+    round_trips = None
+    if commands_before is not None and commands_after is not None:
+        # The admin check on the second /metrics read adds one user lookup
+        round_trips = commands_after - commands_before - 1
+
+    ordered = sorted(latencies)
+    return {
+        "path": path,
+        "requests": len(bodies),
+        "jobs_submitted": jobs,
+        "jobs_accepted": accepted[0],
+        "statuses": statuses,
+        "duration_s": round(duration, 3),
+        "jobs_per_s": round(accepted[0] / duration, 1) if duration else 0.0,
+        "request_p50_ms": round(percentile(ordered, 50), 2),
+        "request_p95_ms": round(percentile(ordered, 95), 2),
+        "db_round_trips": round_trips,
+        "db_round_trips_per_job": round(round_trips / accepted[0], 2) if round_trips is not None and accepted[0] else None,
+    }
+
+
+def bench_token(base_url: str) -> str:
+    engine = Engine(base_url, (SIGNUP,))
+    result = engine.run_once()[0]
+    if not result.success:
+        raise RuntimeError(f"could not create bench account: {result.message}")
+    return engine.context["token"]
+
+
+def run(base_url: str, token: str, sku: str, inputs: Dict[str, Any], jobs: int,
+        batch_size: int, concurrency: int, admin_token: Optional[str] = None) -> Dict[str, Any]:
+    single_bodies = [
+        {"sku_code": sku, "customer_inputs": inputs, "order_id": f"bench_single_{i}"}
+        for i in range(jobs)
+    ]
+    batch_bodies = [
+        {
+            "sku_code": sku,
+            "items": [
+                {"customer_inputs": inputs, "order_id": f"bench_batch_{i}"}
+                for i in range(start, min(start + batch_size, jobs))
+            ],
+        }
+        for start in range(0, jobs, batch_size)
+    ]
+
+    single = run_phase(base_url, token, SINGLE_PATH, single_bodies, concurrency, jobs, admin_token)
+    if single["statuses"].get(402):
+        raise RuntimeError(
+            f"{single['statuses'][402]} of {len(single_bodies)} submissions got 402 insufficient_credits; "
+            f"pass --token for an account holding at least {2 * jobs} x the SKU's base_credits"
+        )
+    batch = run_phase(base_url, token, BATCH_PATH, batch_bodies, min(concurrency, len(batch_bodies)), jobs,
+                      admin_token)
+
+    speedup = None
+    if single["jobs_per_s"] and batch["jobs_per_s"]:
+        speedup = round(batch["jobs_per_s"] / single["jobs_per_s"], 2)
+
+    return {
+        "sku_code": sku,
+        "jobs": jobs,
+        "batch_size": batch_size,
+        "concurrency": concurrency,
+        "single": single,
+        "batch": batch,
+        "jobs_per_s_speedup": speedup,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.bench_batch")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--admin-token", default=DEFAULT_ADMIN_TOKEN, help="admin bearer token for /metrics")
+    parser.add_argument("--token", help="bearer token of a funded account, required for priced SKUs "
+                                         "(default: sign up a new one)")
+    parser.add_argument("--sku", required=True, help="SKU code with a tool configuration")
+    parser.add_argument("--inputs", default="{}", help="customer_inputs JSON used for every job")
+    parser.add_argument("--jobs", type=int, default=200, help="jobs submitted per phase")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    try:
+        token = args.token or bench_token(args.base_url)
+        report = run(args.base_url, token, args.sku, json.loads(args.inputs), args.jobs,
+                     args.batch_size, args.concurrency, args.admin_token)
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print(json.dumps(report, indent=2))
+    return 0 if report["single"]["jobs_accepted"] and report["batch"]["jobs_accepted"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
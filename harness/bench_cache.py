@@ -0,0 +1,121 @@
+"""
+Wire-size and revalidation benchmark for the snapshot-cached public endpoints.
+
+For every scenario tagged ``snapshot`` it issues the same GET as three kinds
+of client and reports bytes on the wire, 304 hit rate and latency:
+
+    cold          new connection per request, no validators, identity encoding
+    warm          keep-alive, no validators, ``Accept-Encoding: br, gzip``
+    revalidating  keep-alive, ``Accept-Encoding: br, gzip`` and
+                  ``If-None-Match`` with the last ETag it saw
+
+    python -m harness.bench_cache --requests 200
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+from .engine import DEFAULT_BASE_URL, Connection, percentile
+from .scenarios import SCENARIOS
+
+MODES = ("cold", "warm", "revalidating")
+
+COMPRESSED = "br, gzip"
+
+
+def _header_bytes(status: int, headers) -> int:
+    # Status line + "Name: value\r\n" per header + blank line
+    return len(f"HTTP/1.1 {status} \r\n") + sum(len(k) + len(v) + 4 for k, v in headers.items()) + 2
+
+
+def bench_path(base_url: str, path: str, mode: str, requests: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    header_bytes = body_bytes = 0
+    etag = None
+    encodings = set()
+
+    headers = {"Accept": "application/json"}
+    if mode == "cold":
+        headers["Accept-Encoding"] = "identity"
+    else:
+        headers["Accept-Encoding"] = COMPRESSED
+
+    conn = Connection(base_url) if mode != "cold" else None
+    try:
+        for _ in range(requests):
+            request_headers = headers
+            if mode == "revalidating" and etag:
+                request_headers = dict(headers, **{"If-None-Match": etag})
+
+            client = conn or Connection(base_url)
+            started = time.perf_counter()
+            try:
+                status, response_headers, raw = client.request("GET", path, None, request_headers)
+            finally:
+                if conn is None:
+                    client.close()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+            statuses[status] = statuses.get(status, 0) + 1
+            header_bytes += _header_bytes(status, response_headers)
+            body_bytes += len(raw)
+            etag = response_headers.get("ETag") or etag
+            if status == 200:
+                encodings.add(response_headers.get("Content-Encoding") or "identity")
+    finally:
+        if conn is not None:
+            conn.close()
+
+    ordered = sorted(latencies)
+    wire = header_bytes + body_bytes
+    return {
+        "requests": requests,
+        "statuses": statuses,
+        "hit_rate_304": round(statuses.get(304, 0) / requests, 3) if requests else 0.0,
+        "encodings": sorted(encodings),
+        "wire_bytes": wire,
+        "bytes_per_request": round(wire / requests, 1) if requests else 0.0,
+        "body_bytes_per_request": round(body_bytes / requests, 1) if requests else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 2),
+        "p95_ms": round(percentile(ordered, 95), 2),
+    }
+
+
+def run(base_url: str, requests: int) -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    for scenario in SCENARIOS:
+        if "snapshot" not in scenario.tags:
+            continue
+        report[scenario.path] = {mode: bench_path(base_url, scenario.path, mode, requests) for mode in MODES}
+    return report
+
+
+def print_table(report: Dict[str, Any]):
+    print(f"{'endpoint':<20} {'mode':<13} {'B/req':>9} {'304 rate':>9} {'p50 ms':>8} {'p95 ms':>8}  encoding")
+    for path, modes in report.items():
+        for mode, row in modes.items():
+            print(f"{path:<20} {mode:<13} {row['bytes_per_request']:>9} {row['hit_rate_304']:>9} "
+                  f"{row['p50_ms']:>8} {row['p95_ms']:>8}  {','.join(row['encodings'])}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.bench_cache")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint and mode")
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.base_url, args.requests)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+"""
+Scenario engine.
+
+``compile_scenarios`` turns declarative ``Scenario`` definitions into
+``CompiledScenario`` objects: URLs, static bodies, header sets and schema
+predicates are all built once, so executing a scenario is a single HTTP call
+on a persistent connection followed by a handful of precompiled checks.
+
+``Engine.run_once`` executes every scenario a single time and reports one
+``Result`` per scenario (functional gate). ``Engine.run_load`` replays the
+same compiled scenarios from several worker threads for a fixed duration and
+aggregates counts and latencies (load driver).
+"""
+
+import http.client
+import itertools
+import json
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from .scenarios import AUTH_TOKEN, Scenario
+
+DEFAULT_BASE_URL = os.environ.get("BACKEND_URL", "http://localhost:8001")
+# Bearer token of an ADMIN_EMAILS account; /metrics is admin-only
+DEFAULT_ADMIN_TOKEN = os.environ.get("BENCH_ADMIN_TOKEN")
+
+Check = Callable[[Any], Optional[str]]
+
+_TYPES = {"object": dict, "array": list, "string": str, "number": (int, float)}
+
+
+@dataclass
+class Result:
+    name: str
+    success: bool
+    status: int
+    elapsed_ms: float
+    message: str = ""
+    details: Any = None
+
+
+class Connection:
+    """Keep-alive HTTP connection that reconnects once when the server dropped an idle socket."""
+
+    def __init__(self, base_url: str, timeout: float = 30):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._conn = None
+
+    def _connect(self):
+        self._conn = self._cls(self.host, self.port, timeout=self.timeout)
+        self._conn.connect()
+        # Headers and body go out in separate writes; don't let Nagle hold the body back
+        self._conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def request(self, method: str, path: str, body: Optional[bytes], headers: Dict[str, str]):
+        """Return ``(status, headers, raw_body)`` for one request.
+
+        A request is retried only on a reused socket the server had already
+        closed: sending failed, or the server hung up without a single
+        response byte. Timeouts and anything after that are raised, since
+        the server may have acted on the request.
+        """
+        for attempt in (0, 1):
+            reused = self._conn is not None
+            if not reused:
+                self._connect()
+            sent = False
+            try:
+                self._conn.request(method, self.prefix + path, body=body, headers=headers)
+                sent = True
+                response = self._conn.getresponse()
+                return response.status, response.headers, response.read()
+            except (http.client.HTTPException, OSError) as exc:
+                self.close()
+                if sent:
+                    stale = isinstance(exc, http.client.RemoteDisconnected)
+                else:
+                    stale = isinstance(exc, (BrokenPipeError, ConnectionResetError))
+                if attempt or not reused or not stale:
+                    raise
+        raise RuntimeError("unreachable")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _lookup(data: Any, dotted: str) -> Any:
+    for key in dotted.split("."):
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+def compile_schema(spec: Optional[Dict[str, Any]]) -> Tuple[Check, ...]:
+    """Compile a schema spec into predicates returning an error or ``None``."""
+    if not spec:
+        return ()
+
+    checks: List[Check] = []
+
+    if "type" in spec:
+        expected = _TYPES[spec["type"]]
+        label = spec["type"]
+        checks.append(lambda data: None if isinstance(data, expected) else f"Response is not an {label}")
+
+    required = tuple(spec.get("required", ()))
+    if required:
+        def check_required(data):
+            missing = [key for key in required if key not in data]
+            return f"Missing fields: {missing}" if missing else None
+        checks.append(check_required)
+
+    for key, type_name in spec.get("fields", {}).items():
+        def check_field(data, key=key, expected=_TYPES[type_name], type_name=type_name):
+            return None if isinstance(data.get(key), expected) else f"Field {key!r} is not an {type_name}"
+        checks.append(check_field)
+
+    if "length" in spec:
+        length = spec["length"]
+        checks.append(lambda data: None if len(data) == length else f"Expected {length} items, got {len(data)}")
+
+    items_required = tuple(spec.get("items_required", ()))
+    if items_required:
+        def check_items(data):
+            for item in data:
+                if not isinstance(item, dict) or any(key not in item for key in items_required):
+                    return f"Item missing one of {list(items_required)}"
+            return None
+        checks.append(check_items)
+
+    for key, value in spec.get("equals", {}).items():
+        allowed = value if isinstance(value, tuple) else (value,)
+
+        def check_equals(data, key=key, allowed=allowed):
+            actual = _lookup(data, key)
+            return None if actual in allowed else f"Field {key!r} is {actual!r}, expected {' or '.join(map(repr, allowed))}"
+        checks.append(check_equals)
+
+    return tuple(checks)
+
+
+def _templated(value: Any) -> bool:
+    if isinstance(value, str):
+        return "{uid}" in value
+    if isinstance(value, dict):
+        return any(_templated(v) for v in value.values())
+    return False
+
+
+def _render(value: Any, uid: str) -> Any:
+    if isinstance(value, str):
+        return value.replace("{uid}", uid)
+    if isinstance(value, dict):
+        return {k: _render(v, uid) for k, v in value.items()}
+    return value
+
+
+class CompiledScenario:
+    __slots__ = ("name", "method", "path", "needs_token", "expect", "checks",
+                 "capture", "parse", "headers", "_static_body", "_body_factory")
+
+    def __init__(self, scenario: Scenario):
+        self.name = scenario.name
+        self.method = scenario.method
+        self.path = scenario.path
+        self.needs_token = scenario.auth == AUTH_TOKEN
+        self.expect = frozenset(scenario.expect_status)
+        self.checks = compile_schema(scenario.schema)
+        self.capture = tuple(scenario.capture.items())
+        self.parse = bool(self.checks or self.capture)
+        self.headers = {"Accept": "application/json"}
+        self._static_body = None
+        self._body_factory = None
+
+        if scenario.json is not None:
+            self.headers["Content-Type"] = "application/json"
+            payload, encode = scenario.json, lambda v: json.dumps(v).encode()
+        elif scenario.form is not None:
+            self.headers["Content-Type"] = "application/x-www-form-urlencoded"
+            payload, encode = scenario.form, lambda v: urlencode(v).encode()
+        else:
+            payload = None
+
+        if payload is not None:
+            if _templated(payload):
+                self._body_factory = lambda uid: encode(_render(payload, uid))
+            else:
+                self._static_body = encode(payload)
+
+    def body(self, uid: str) -> Optional[bytes]:
+        if self._body_factory is not None:
+            return self._body_factory(uid)
+        return self._static_body
+
+    def execute(self, conn: Connection, context: Dict[str, Any], uid: str) -> Result:
+        headers = self.headers
+        if self.needs_token:
+            token = context.get("token")
+            if not token:
+                return Result(self.name, False, 0, 0.0, "No auth token available")
+            headers = dict(headers, Authorization=f"Bearer {token}")
+
+        started = time.perf_counter()
+        try:
+            status, _, raw = conn.request(self.method, self.path, self.body(uid), headers)
+        except Exception as e:
+            return Result(self.name, False, 0, (time.perf_counter() - started) * 1000, f"Exception: {e}")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if status not in self.expect:
+            return Result(self.name, False, status, elapsed_ms, f"HTTP {status}", raw[:200])
+
+        # Error responses are only read when the scenario asserts on them
+        if not self.parse or (status >= 300 and not self.checks):
+            return Result(self.name, True, status, elapsed_ms, f"HTTP {status}")
+
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return Result(self.name, False, status, elapsed_ms, "Invalid JSON", raw[:200])
+
+        for check in self.checks:
+            error = check(data)
+            if error:
+                return Result(self.name, False, status, elapsed_ms, error, data)
+
+        for key, dotted in self.capture if status < 300 else ():
+            if key not in context:
+                value = _lookup(data, dotted)
+                if value is not None:
+                    context[key] = value
+
+        return Result(self.name, True, status, elapsed_ms, f"HTTP {status}")
+
+
+def compile_scenarios(scenarios: Sequence[Scenario]) -> Tuple[CompiledScenario, ...]:
+    return tuple(CompiledScenario(s) for s in scenarios)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+@dataclass
+class ScenarioStats:
+    count: int = 0
+    failures: int = 0
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+    def record(self, result: Result):
+        self.count += 1
+        if not result.success:
+            self.failures += 1
+        self.latencies.append(result.elapsed_ms)
+        self.statuses[result.status] = self.statuses.get(result.status, 0) + 1
+
+    def merge(self, other: "ScenarioStats"):
+        self.count += other.count
+        self.failures += other.failures
+        self.latencies.extend(other.latencies)
+        for status, n in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + n
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "statuses": dict(self.statuses),
+            "p50_ms": round(percentile(ordered, 50), 2),
+            "p95_ms": round(percentile(ordered, 95), 2),
+            "p99_ms": round(percentile(ordered, 99), 2),
+            "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+        }
+
+
+@dataclass
+class LoadReport:
+    duration_s: float
+    concurrency: int
+    scenarios: Dict[str, ScenarioStats]
+
+    @property
+    def total(self) -> int:
+        return sum(s.count for s in self.scenarios.values())
+
+    @property
+    def failures(self) -> int:
+        return sum(s.failures for s in self.scenarios.values())
+
+    @property
+    def rps(self) -> float:
+        return self.total / self.duration_s if self.duration_s else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "duration_s": round(self.duration_s, 3),
+            "concurrency": self.concurrency,
+            "requests": self.total,
+            "failures": self.failures,
+            "rps": round(self.rps, 1),
+            "scenarios": {name: stats.summary() for name, stats in self.scenarios.items()},
+        }
+
+
+class Engine:
+    def __init__(self, base_url: str, scenarios: Sequence[Scenario], timeout: float = 30):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.compiled = compile_scenarios(scenarios)
+        self.context: Dict[str, Any] = {}
+        self._run_id = str(int(time.time() * 1000))
+
+    def connection(self) -> Connection:
+        return Connection(self.base_url, self.timeout)
+
+    def run_once(self, on_result: Optional[Callable[[Result], None]] = None) -> List[Result]:
+        """Execute every scenario once, in order, sharing one context."""
+        conn = self.connection()
+        results = []
+        try:
+            for i, scenario in enumerate(self.compiled):
+                result = scenario.execute(conn, self.context, f"{self._run_id}_{i}")
+                results.append(result)
+                if on_result:
+                    on_result(result)
+        finally:
+            conn.close()
+        return results
+
+    def run_load(self, duration: float, concurrency: int = 8,
+                 scenarios: Optional[Sequence[CompiledScenario]] = None,
+                 warmup: bool = True) -> LoadReport:
+        """
+        Replay scenarios round-robin from ``concurrency`` threads for
+        ``duration`` seconds. A single warm-up pass fills the shared context
+        (auth token) first so token-protected scenarios can run.
+        """
+        if warmup and not self.context:
+            self.run_once()
+
+        plan = tuple(scenarios or self.compiled)
+        shared = dict(self.context)
+        per_worker: List[Dict[str, ScenarioStats]] = []
+        deadline = time.perf_counter() + duration
+        start_barrier = threading.Barrier(concurrency + 1)
+
+        def worker(index: int):
+            conn = self.connection()
+            context = dict(shared)
+            stats = {s.name: ScenarioStats() for s in plan}
+            per_worker.append(stats)
+            counter = itertools.count()
+            prefix = f"{self._run_id}_w{index}_"
+            start_barrier.wait()
+            try:
+                for scenario in itertools.cycle(plan):
+                    if time.perf_counter() >= deadline:
+                        break
+                    stats[scenario.name].record(scenario.execute(conn, context, prefix + str(next(counter))))
+            finally:
+                conn.close()
+
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        start_barrier.wait()
+        started = time.perf_counter()
+        deadline = started + duration
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        merged = {s.name: ScenarioStats() for s in plan}
+        for stats in per_worker:
+            for name, value in stats.items():
+                merged[name].merge(value)
+
+        return LoadReport(elapsed, concurrency, merged)
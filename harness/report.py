@@ -0,0 +1,44 @@
+"""
+Console reporting shared by the functional gate scripts.
+"""
+
+from .engine import Result
+
+
+def print_result(result: Result):
+    status = "✅ PASS" if result.success else "❌ FAIL"
+    print(f"{status}: {result.name} - {result.message}")
+    if result.details is not None and not result.success:
+        print(f"   Details: {result.details}")
+
+
+def print_summary(results) -> bool:
+    print("\n" + "=" * 60)
+    print("🧪 TEST SUMMARY")
+    print("=" * 60)
+
+    passed = sum(1 for r in results if r.success)
+    failed = len(results) - passed
+
+    print(f"Total Tests: {len(results)}")
+    print(f"✅ Passed: {passed}")
+    print(f"❌ Failed: {failed}")
+
+    if failed:
+        print("\n🔍 FAILED TESTS:")
+        for r in results:
+            if not r.success:
+                print(f"  • {r.name}: {r.message}")
+
+    return failed == 0
+
+
+def print_migration_status(results):
+    def working(word):
+        return any(r.success and word in r.name.lower() for r in results)
+
+    print("\n📊 MongoDB Migration Status:")
+    print(f"  • Authentication: {'✅ Working' if working('auth') else '❌ Issues'}")
+    print(f"  • Catalog: {'✅ Working' if working('catalog') else '❌ Issues'}")
+    print(f"  • Credits System: {'✅ Working' if working('credits') else '❌ Issues'}")
+    print(f"  • Stats Endpoint: {'✅ Working' if working('stats') else '❌ Issues'}")
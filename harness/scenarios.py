@@ -0,0 +1,224 @@
+"""
+Declarative backend scenarios.
+
+Each scenario describes one HTTP call and what a correct answer looks like.
+Nothing in here performs I/O; ``harness.engine`` compiles these definitions
+into callables once and then reuses them for every execution.
+
+Schema specs are small dicts understood by the engine:
+
+    {"type": "object" | "array",
+     "required": ("field", ...),          # keys that must be present
+     "fields": {"field": "array", ...},   # type of selected keys
+     "length": 4,                         # exact length (arrays)
+     "items_required": ("field", ...),    # keys every array item must have
+     "equals": {"dotted.path": value}}    # exact value; a tuple means any of
+
+String values in ``json`` and ``form`` bodies may contain ``{uid}``, which is
+replaced by a value that is unique per execution (used for signup emails).
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+# Auth requirements
+AUTH_NONE = "none"    # never send an Authorization header
+AUTH_TOKEN = "token"  # send the bearer token captured earlier in the run
+
+TEST_PASSWORD = "testpass123"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    path: str
+    expect_status: Tuple[int, ...] = (200,)
+    auth: str = AUTH_NONE
+    json: Optional[Dict[str, Any]] = None
+    form: Optional[Dict[str, Any]] = None
+    schema: Optional[Dict[str, Any]] = None
+    # context key -> dotted path into the JSON response; only filled when
+    # the key is not already set, so the first successful capture wins
+    capture: Dict[str, str] = field(default_factory=dict)
+    tags: Tuple[str, ...] = ()
+
+
+HEALTH = tuple(
+    Scenario(
+        name=f"Health check {path}",
+        method="GET",
+        path=path,
+        schema={"type": "object", "required": ("status",)},
+        tags=("public", "health"),
+    )
+    for path in ("/health", "/ready", "/alive")
+)
+
+STATS = Scenario(
+    name="Stats endpoint",
+    method="GET",
+    path="/stats",
+    schema={
+        "type": "object",
+        "required": ("videos", "paying_users", "total_users", "conversion_rate", "revenue_cents"),
+    },
+    tags=("public", "catalog", "snapshot"),
+)
+
+CATALOG = Scenario(
+    name="Catalog endpoint",
+    method="GET",
+    path="/api/web/catalog",
+    schema={
+        "type": "object",
+        "required": ("categories", "total_tools"),
+        "fields": {"categories": "object"},
+    },
+    tags=("public", "catalog", "snapshot"),
+)
+
+PACKS = Scenario(
+    name="Packs endpoint",
+    method="GET",
+    path="/api/web/packs",
+    schema={
+        "type": "array",
+        "length": 4,
+        "items_required": ("type", "points", "price_cents"),
+    },
+    tags=("public", "catalog", "snapshot"),
+)
+
+SKUS = Scenario(
+    name="SKUs endpoint",
+    method="GET",
+    path="/api/skus",
+    schema={"type": "object", "required": ("skus",), "fields": {"skus": "array"}},
+    tags=("public", "catalog", "snapshot"),
+)
+
+PLANS = Scenario(
+    name="Plans endpoint",
+    method="GET",
+    path="/api/plans",
+    schema={"type": "object", "required": ("plans",), "fields": {"plans": "array"}},
+    tags=("public", "catalog", "snapshot"),
+)
+
+FLAGS = Scenario(
+    name="Flags endpoint",
+    method="GET",
+    path="/api/flags",
+    schema={"type": "object", "required": ("flags",), "fields": {"flags": "array"}},
+    tags=("public", "catalog", "snapshot"),
+)
+
+SIGNUP = Scenario(
+    name="Auth signup",
+    method="POST",
+    path="/api/auth/signup",
+    expect_status=(201,),
+    json={"email": "testuser_{uid}@example.com", "password": TEST_PASSWORD},
+    schema={"type": "object", "required": ("token", "user")},
+    capture={"token": "token", "user_id": "user.id"},
+    tags=("auth", "write"),
+)
+
+# The fixed test account may not exist; a clean 401 is an acceptable answer
+LOGIN = Scenario(
+    name="Auth login",
+    method="POST",
+    path="/api/auth/login",
+    expect_status=(200, 401),
+    json={"email": "test@example.com", "password": TEST_PASSWORD},
+    capture={"token": "token", "user_id": "user.id"},
+    tags=("auth",),
+)
+
+ME = Scenario(
+    name="Auth me",
+    method="GET",
+    path="/api/auth/me",
+    auth=AUTH_TOKEN,
+    schema={"type": "object", "required": ("id", "email")},
+    tags=("auth", "user"),
+)
+
+CREDITS = Scenario(
+    name="Credits endpoint",
+    method="GET",
+    path="/api/web/credits",
+    auth=AUTH_TOKEN,
+    schema={"type": "object", "required": ("balance",)},
+    tags=("user",),
+)
+
+CREATIONS = Scenario(
+    name="Creations endpoint",
+    method="GET",
+    path="/api/web/creations",
+    auth=AUTH_TOKEN,
+    schema={"type": "object", "required": ("items",), "fields": {"items": "array"}},
+    tags=("user",),
+)
+
+UNAUTHORIZED = tuple(
+    Scenario(
+        name=f"Unauthorized {path}",
+        method="GET",
+        path=path,
+        expect_status=(401,),
+        tags=("auth", "negative"),
+    )
+    for path in ("/api/auth/me", "/api/web/credits", "/api/web/creations")
+)
+
+STATUS = (
+    Scenario(
+        name="Status endpoint (no ID)",
+        method="GET",
+        path="/api/web/status",
+        expect_status=(400,),
+        schema={"type": "object", "equals": {"error": "missing_id"}},
+        tags=("negative",),
+    ),
+    # A malformed ObjectId may surface as 500 rather than 404
+    Scenario(
+        name="Status endpoint (invalid ID)",
+        method="GET",
+        path="/api/web/status?id=invalid_job_id",
+        expect_status=(404, 500),
+        schema={"type": "object", "equals": {"error": ("not_found", "status_check_failed")}},
+        tags=("negative",),
+    ),
+)
+
+UPLOAD = Scenario(
+    name="Upload endpoint (no file)",
+    method="POST",
+    path="/api/web/upload",
+    auth=AUTH_TOKEN,
+    form={"type": "faceswap"},
+    schema={"type": "object", "required": ("status", "job_id")},
+    tags=("user", "write"),
+)
+
+# The order matters: auth scenarios capture the token used by later ones
+SCENARIOS = (
+    *HEALTH,
+    STATS,
+    CATALOG,
+    PACKS,
+    SKUS,
+    PLANS,
+    FLAGS,
+    SIGNUP,
+    LOGIN,
+    ME,
+    CREDITS,
+    CREATIONS,
+    *UNAUTHORIZED,
+)
+
+EXTENDED_SCENARIOS = SCENARIOS + (*STATUS, UPLOAD)
@@ -22,21 +22,21 @@ const logger = winston.createLogger({
 
 const router = express.Router();
 const upload = multer({ storage: multer.memoryStorage(), limits: { fileSize: 20971520 } }); // 20MB limit
+const MAX_BATCH_ITEMS = parseInt(process.env.JOB_BATCH_MAX_ITEMS) || 500;
 
 /**
  * Initialize services
  */
-function initializeServices(db) {
-    const configManager = new SKUConfigManager(db);
+function initializeServices() {
+    // The services reach MongoDB through db/mongo themselves
+    const configManager = new SKUConfigManager();
     const jobProcessor = new JobProcessor(
-        db,
         process.env.A2E_API_KEY,
         process.env.A2E_BASE_URL
     );
     const a2eService = new A2EServiceEnhanced(
         process.env.A2E_API_KEY,
-        process.env.A2E_BASE_URL,
-        db
+        process.env.A2E_BASE_URL
     );
 
     return { configManager, jobProcessor, a2eService };
@@ -77,8 +77,12 @@ function sanitizeInput(req, res, next) {
 
 router.use(sanitizeInput);
 
-module.exports = function (db, authenticateToken, isAdmin) {
-    const { configManager, jobProcessor, a2eService } = initializeServices(db);
+/**
+ * Build the router
+ * With jobsOnly, only the SKU configuration and job endpoints are registered
+ */
+module.exports = function (db, authenticateToken, isAdmin, { jobsOnly = false } = {}) {
+    const { configManager, jobProcessor, a2eService } = initializeServices();
 
     // ==========================================================================
     // SKU TOOL CONFIGURATION ENDPOINTS
@@ -88,10 +92,10 @@ module.exports = function (db, authenticateToken, isAdmin) {
      * GET /api/skus/:sku_code/config
      * Get tool configuration for a specific SKU
      */
-    router.get('/api/skus/:sku_code/config', authenticateToken, (req, res) => {
+    router.get('/api/skus/:sku_code/config', authenticateToken, async (req, res) => {
         try {
             const { sku_code } = req.params;
-            const config = configManager.getConfig(sku_code);
+            const config = await configManager.getConfig(sku_code);
 
             if (!config) {
                 return res.status(404).json({ error: 'Configuration not found for this SKU' });
@@ -113,12 +117,12 @@ module.exports = function (db, authenticateToken, isAdmin) {
      * POST /api/skus/:sku_code/validate
      * Validate customer inputs for a SKU
      */
-    router.post('/api/skus/:sku_code/validate', authenticateToken, (req, res) => {
+    router.post('/api/skus/:sku_code/validate', authenticateToken, async (req, res) => {
         try {
             const { sku_code } = req.params;
             const { customer_inputs } = req.body;
 
-            const validation = configManager.validateCustomerInputs(sku_code, customer_inputs);
+            const validation = await configManager.validateCustomerInputs(sku_code, customer_inputs);
             res.json(validation);
         } catch (error) {
             logger.error('Validate inputs error', { error: error.message });
@@ -144,7 +148,7 @@ module.exports = function (db, authenticateToken, isAdmin) {
             }
 
             // Validate inputs
-            const validation = configManager.validateCustomerInputs(sku_code, customer_inputs);
+            const validation = await configManager.validateCustomerInputs(sku_code, customer_inputs);
             if (!validation.valid) {
                 return res.status(400).json({
                     error: 'Validation failed',
@@ -163,30 +167,78 @@ module.exports = function (db, authenticateToken, isAdmin) {
 
             logger.info('Advanced job created', { jobId, userId, sku_code });
         } catch (error) {
+            if (error.message === 'insufficient_credits') {
+                return res.status(402).json({ error: 'insufficient_credits' });
+            }
             logger.error('Create advanced job error', { error: error.message, stack: error.stack });
             res.status(500).json({ error: 'Job creation failed', details: error.message });
         }
     });
 
+    /**
+     * POST /api/jobs/create-batch
+     * Create many jobs for one SKU in a single request
+     * Body: { sku_code, items: [{ customer_inputs, order_id }] }
+     * Responds with one result per item, in request order; items that passed
+     * validation but could not be stored come back as 'failed' and are not charged
+     */
+    router.post('/api/jobs/create-batch', authenticateToken, async (req, res) => {
+        try {
+            const { sku_code, items } = req.body;
+            const userId = req.user.id;
+
+            if (!sku_code || !Array.isArray(items) || items.length === 0) {
+                return res.status(400).json({ error: 'sku_code and a non-empty items array are required' });
+            }
+            if (items.length > MAX_BATCH_ITEMS) {
+                return res.status(400).json({ error: `A batch may contain at most ${MAX_BATCH_ITEMS} items` });
+            }
+            if (items.some(item => !item || typeof item.customer_inputs !== 'object' || item.customer_inputs === null)) {
+                return res.status(400).json({ error: 'Every item requires a customer_inputs object' });
+            }
+
+            const { results, credits_reserved } = await jobProcessor.createJobBatch(userId, sku_code, items);
+            const accepted = results.filter(result => result.status === 'accepted').length;
+            const failed = results.filter(result => result.status === 'failed').length;
+
+            res.status(accepted > 0 ? 201 : 400).json({
+                sku_code,
+                accepted,
+                rejected: results.length - accepted - failed,
+                failed,
+                credits_reserved,
+                results
+            });
+
+            logger.info('Batch jobs created', { userId, sku_code, accepted, total: results.length });
+        } catch (error) {
+            if (error.message === 'insufficient_credits') {
+                return res.status(402).json({ error: 'insufficient_credits' });
+            }
+            logger.error('Create batch jobs error', { error: error.message, stack: error.stack });
+            res.status(500).json({ error: 'Batch job creation failed', details: error.message });
+        }
+    });
+
     /**
      * GET /api/jobs/:job_id/status
      * Get detailed job status with step information
      */
-    router.get('/api/jobs/:job_id/status', authenticateToken, (req, res) => {
+    router.get('/api/jobs/:job_id/status', authenticateToken, async (req, res) => {
         try {
             const { job_id } = req.params;
             const userId = req.user.id;
 
-            // Verify job ownership
-            const job = db.prepare('SELECT user_id FROM jobs WHERE id = ?').get(job_id);
-            if (!job) {
+            const status = await jobProcessor.getJobStatus(job_id);
+            if (!status) {
                 return res.status(404).json({ error: 'Job not found' });
             }
-            if (job.user_id !== userId) {
+
+            // Verify job ownership
+            if (status.user_id !== String(userId)) {
                 return res.status(403).json({ error: 'Access denied' });
             }
 
-            const status = jobProcessor.getJobStatus(job_id);
             res.json(status);
         } catch (error) {
             logger.error('Get job status error', { error: error.message });
@@ -204,11 +256,11 @@ module.exports = function (db, authenticateToken, isAdmin) {
             const userId = req.user.id;
 
             // Verify job ownership
-            const job = db.prepare('SELECT user_id FROM jobs WHERE id = ?').get(job_id);
+            const job = await db.getJob(job_id);
             if (!job) {
                 return res.status(404).json({ error: 'Job not found' });
             }
-            if (job.user_id !== userId) {
+            if (job.user_id !== String(userId)) {
                 return res.status(403).json({ error: 'Access denied' });
             }
 
@@ -222,6 +274,10 @@ module.exports = function (db, authenticateToken, isAdmin) {
         }
     });
 
+    if (jobsOnly) {
+        return router;
+    }
+
     // ==========================================================================
     // FILE UPLOAD ENDPOINTS
     // ==========================================================================
@@ -534,7 +590,7 @@ module.exports = function (db, authenticateToken, isAdmin) {
      * PUT /api/admin/skus/:sku_code/config
      * Update SKU tool configuration (admin only)
      */
-    router.put('/api/admin/skus/:sku_code/config', authenticateToken, isAdmin, (req, res) => {
+    router.put('/api/admin/skus/:sku_code/config', authenticateToken, isAdmin, async (req, res) => {
         try {
             const { sku_code } = req.params;
             const { steps, customer_options } = req.body;
@@ -547,7 +603,7 @@ module.exports = function (db, authenticateToken, isAdmin) {
                 return res.status(400).json({ error: 'customer_options array is required' });
             }
 
-            const configId = configManager.saveConfig(sku_code, steps, customer_options);
+            const configId = await configManager.saveConfig(sku_code, steps, customer_options);
 
             res.json({
                 message: 'Configuration saved successfully',
@@ -46,25 +46,124 @@ class JobProcessor {
         const sku = await db.getSkuByCode(skuCode);
         const estimatedCredits = sku ? sku.base_credits : 0;
 
+        // Charge up front, like createJobBatch; handleJobFailure refunds
+        if (estimatedCredits > 0) {
+            const balance = await db.reserveCredits(userId, estimatedCredits);
+            if (balance === null) {
+                throw new Error('insufficient_credits');
+            }
+        }
+
         // Create job record
-        const job = await db.createJob(userId, skuCode, null, {
-            order_id: orderId,
-            cost_credits: estimatedCredits
-        });
+        let job;
+        try {
+            job = await db.createJob(userId, skuCode, null, {
+                order_id: orderId,
+                cost_credits: estimatedCredits
+            });
+        } catch (error) {
+            if (estimatedCredits > 0) {
+                await db.releaseCredits(userId, estimatedCredits);
+            }
+            throw error;
+        }
 
         const jobId = job.id;
 
         logger.info('Job created', { jobId, userId, skuCode, orderId });
 
-        // Start job execution asynchronously
+        // Start job execution asynchronously; executeJob records the failure
         this.executeJob(jobId, config, customerInputs).catch(error => {
             logger.error('Job execution failed', { jobId, error: error.message });
-            this.handleJobFailure(jobId, error.message);
         });
 
         return jobId;
     }
 
+    /**
+     * Create and start a batch of jobs for one SKU
+     * Config and SKU are loaded once, credits for every valid item are
+     * reserved in a single atomic update and the jobs are inserted in bulk.
+     * Items that fail validation are reported and not charged.
+     */
+    async createJobBatch(userId, skuCode, items) {
+        const config = await this.configManager.getConfig(skuCode);
+        if (!config) {
+            throw new Error(`No configuration found for SKU: ${skuCode}`);
+        }
+
+        const sku = await db.getSkuByCode(skuCode);
+        const creditsPerJob = sku ? sku.base_credits : 0;
+
+        const results = items.map((item, index) => {
+            const validation = this.configManager.validateAgainstConfig(config, item.customer_inputs);
+            if (!validation.valid) {
+                return { index, status: 'rejected', validation_errors: validation.errors };
+            }
+            return { index, status: 'accepted' };
+        });
+
+        const accepted = results.filter(result => result.status === 'accepted');
+        if (accepted.length === 0) {
+            return { results, credits_reserved: 0 };
+        }
+
+        const creditsReserved = creditsPerJob * accepted.length;
+        if (creditsReserved > 0) {
+            const balance = await db.reserveCredits(userId, creditsReserved);
+            if (balance === null) {
+                throw new Error('insufficient_credits');
+            }
+        }
+
+        let jobs;
+        try {
+            jobs = await db.createJobs(userId, skuCode, accepted.map(result => ({
+                order_id: items[result.index].order_id,
+                cost_credits: creditsPerJob
+            })));
+        } catch (error) {
+            if (!error.insertedJobs) {
+                // Unknown how much of the batch landed; keep the reservation
+                // rather than refund jobs that may exist
+                logger.error('Job batch insert failed with unknown outcome', { userId, skuCode, creditsReserved, error: error.message });
+                throw error;
+            }
+
+            jobs = error.insertedJobs;
+            const missing = jobs.filter(job => !job).length;
+            if (creditsPerJob > 0) {
+                await db.releaseCredits(userId, creditsPerJob * missing);
+            }
+            if (missing === accepted.length) {
+                throw error;
+            }
+            logger.error('Job batch partially inserted', { userId, skuCode, missing, error: error.message });
+        }
+
+        let creditsCharged = 0;
+        accepted.forEach((result, i) => {
+            if (!jobs[i]) {
+                result.status = 'failed';
+                result.error = 'insert_failed';
+                return;
+            }
+
+            const jobId = jobs[i].id;
+            result.job_id = jobId;
+            creditsCharged += creditsPerJob;
+
+            this.executeJob(jobId, config, items[result.index].customer_inputs).catch(error => {
+                logger.error('Job execution failed', { jobId, error: error.message });
+            });
+        });
+
+        const count = status => results.filter(result => result.status === status).length;
+        logger.info('Job batch created', { userId, skuCode, accepted: count('accepted'), rejected: count('rejected'), failed: count('failed') });
+
+        return { results, credits_reserved: creditsCharged };
+    }
+
     /**
      * Execute job steps sequentially
      */
@@ -109,7 +208,7 @@ class JobProcessor {
 
         } catch (error) {
             logger.error('Job execution error', { jobId, error: error.message, stack: error.stack });
-            this.handleJobFailure(jobId, error.message);
+            await this.handleJobFailure(jobId, error.message);
             throw error;
         }
     }
@@ -118,8 +217,6 @@ class JobProcessor {
      * Execute a single step
      */
     async executeStep(jobId, step, customerInputs, previousResults) {
-        const now = new Date().toISOString();
-
         // Evaluate condition
         const shouldExecute = this.configManager.evaluateCondition(
             step.condition_expression,
@@ -134,13 +231,12 @@ class JobProcessor {
             });
 
             // Record skipped step
-            const stepResult = this.db.prepare(`
-                INSERT INTO job_steps (
-                    job_id, step_order, step_name, a2e_endpoint, status, created_at
-                ) VALUES (?, ?, ?, ?, 'skipped', ?)
-            `).run(jobId, step.step_order, step.step_name, step.a2e_endpoint, now);
+            const skipped = await db.createJobStep(jobId, step.step_order, step.a2e_endpoint, {}, {
+                step_name: step.step_name,
+                status: 'skipped'
+            });
 
-            return { status: 'skipped', step_id: stepResult.lastInsertRowid };
+            return { status: 'skipped', step_id: skipped._id.toString() };
         }
 
         // Interpolate parameters
@@ -157,22 +253,13 @@ class JobProcessor {
         });
 
         // Create step record
-        const stepResult = this.db.prepare(`
-            INSERT INTO job_steps (
-                job_id, step_order, step_name, a2e_endpoint, status,
-                input_params, started_at, created_at
-            ) VALUES (?, ?, ?, ?, 'processing', ?, ?, ?)
-        `).run(
-            jobId,
-            step.step_order,
-            step.step_name,
-            step.a2e_endpoint,
-            JSON.stringify(params),
-            now,
-            now
-        );
+        const stepRecord = await db.createJobStep(jobId, step.step_order, step.a2e_endpoint, params, {
+            step_name: step.step_name,
+            status: 'processing',
+            started_at: new Date()
+        });
 
-        const stepId = stepResult.lastInsertRowid;
+        const stepId = stepRecord._id.toString();
 
         try {
             // Call A2E API
@@ -185,27 +272,19 @@ class JobProcessor {
             const taskId = response?.data?._id || response?.data?.id;
 
             // Update step with task ID
-            this.db.prepare(`
-                UPDATE job_steps 
-                SET a2e_task_id = ?, output_data = ? 
-                WHERE id = ?
-            `).run(taskId, JSON.stringify(response), stepId);
+            await db.updateJobStep(stepId, { task_id: taskId, output_data: response });
 
             // If task is async, start polling
             if (taskId && this.isAsyncEndpoint(step.a2e_endpoint)) {
                 await this.pollTaskStatus(jobId, stepId, step.a2e_endpoint, taskId);
             } else {
                 // Synchronous response, mark as completed
-                this.db.prepare(`
-                    UPDATE job_steps 
-                    SET status = 'completed', completed_at = ? 
-                    WHERE id = ?
-                `).run(new Date().toISOString(), stepId);
+                await db.updateJobStep(stepId, { status: 'completed', completed_at: new Date() });
             }
 
             // Get final step data
-            const finalStep = this.db.prepare('SELECT * FROM job_steps WHERE id = ?').get(stepId);
-            const outputData = JSON.parse(finalStep.output_data || '{}');
+            const finalStep = await db.getJobStep(stepId);
+            const outputData = finalStep.output_data || {};
 
             return {
                 status: finalStep.status,
@@ -224,14 +303,10 @@ class JobProcessor {
             });
 
             // Update step as failed
-            this.db.prepare(`
-                UPDATE job_steps 
-                SET status = 'failed', error_message = ?, completed_at = ? 
-                WHERE id = ?
-            `).run(error.message, new Date().toISOString(), stepId);
+            await this.saveStep(stepId, { status: 'failed', error_message: error.message, completed_at: new Date() });
 
             // Log error
-            this.logError('error', 'step_execution_failed', error.message, {
+            await this.logError('error', 'step_execution_failed', error.message, {
                 job_id: jobId,
                 step_id: stepId,
                 step_name: step.step_name,
@@ -247,6 +322,18 @@ class JobProcessor {
         }
     }
 
+    /**
+     * Persist step progress
+     * A failed write is logged rather than thrown, so it cannot stall polling
+     */
+    async saveStep(stepId, updates) {
+        try {
+            await db.updateJobStep(stepId, updates);
+        } catch (error) {
+            logger.error('Step update failed', { stepId, error: error.message });
+        }
+    }
+
     /**
      * Call A2E API endpoint
      */
@@ -324,11 +411,7 @@ class JobProcessor {
                             status.data.media_url || '';
 
                         // Update step
-                        this.db.prepare(`
-                            UPDATE job_steps 
-                            SET status = 'completed', output_data = ?, completed_at = ? 
-                            WHERE id = ?
-                        `).run(JSON.stringify(status), new Date().toISOString(), stepId);
+                        await this.saveStep(stepId, { status: 'completed', output_data: status, completed_at: new Date() });
 
                         logger.info('Task completed', { jobId, stepId, taskId, resultUrl });
                         resolve({ status: 'completed', result_url: resultUrl });
@@ -341,11 +424,7 @@ class JobProcessor {
                             'Unknown error';
 
                         // Update step
-                        this.db.prepare(`
-                            UPDATE job_steps 
-                            SET status = 'failed', error_message = ?, completed_at = ? 
-                            WHERE id = ?
-                        `).run(errorMessage, new Date().toISOString(), stepId);
+                        await this.saveStep(stepId, { status: 'failed', error_message: errorMessage, completed_at: new Date() });
 
                         logger.error('Task failed', { jobId, stepId, taskId, errorMessage });
                         reject(new Error(errorMessage));
@@ -354,11 +433,7 @@ class JobProcessor {
                         clearInterval(pollInterval);
 
                         const timeoutError = 'Task timeout after 30 minutes';
-                        this.db.prepare(`
-                            UPDATE job_steps 
-                            SET status = 'failed', error_message = ?, completed_at = ? 
-                            WHERE id = ?
-                        `).run(timeoutError, new Date().toISOString(), stepId);
+                        await this.saveStep(stepId, { status: 'failed', error_message: timeoutError, completed_at: new Date() });
 
                         logger.error('Task timeout', { jobId, stepId, taskId });
                         reject(new Error(timeoutError));
@@ -406,41 +481,32 @@ class JobProcessor {
     /**
      * Handle job failure
      */
-    handleJobFailure(jobId, errorMessage) {
-        const now = new Date().toISOString();
-
-        // Update job status
-        this.db.prepare(`
-            UPDATE jobs 
-            SET status = 'failed', error_message = ?, updated_at = ? 
-            WHERE id = ?
-        `).run(errorMessage, now, jobId);
-
-        // Get job details
-        const job = this.db.prepare('SELECT user_id, order_id, cost_credits FROM jobs WHERE id = ?').get(jobId);
-
-        // Refund credits if applicable
-        if (job && job.cost_credits > 0) {
-            try {
-                this.db.prepare('UPDATE user_credits SET balance = balance + ? WHERE user_id = ?')
-                    .run(job.cost_credits, job.user_id);
-                logger.info('Credits refunded', { jobId, userId: job.user_id, credits: job.cost_credits });
-            } catch (error) {
-                logger.error('Credit refund failed', { jobId, error: error.message });
+    async handleJobFailure(jobId, errorMessage) {
+        let job = null;
+
+        try {
+            // Only the call that actually fails the job refunds it
+            job = await db.failJob(jobId, errorMessage);
+            const credits = job ? job.options.cost_credits : 0;
+
+            if (credits > 0) {
+                await db.releaseCredits(job.user_id, credits);
+                logger.info('Credits refunded', { jobId, userId: job.user_id, credits });
             }
-        }
 
-        // Update order status
-        if (job && job.order_id) {
-            this.db.prepare('UPDATE orders SET status = ? WHERE id = ?')
-                .run('failed', job.order_id);
+            // Update order status
+            if (job && job.options.order_id) {
+                await db.updateOrderStatus(job.options.order_id, 'failed');
+            }
+        } catch (error) {
+            logger.error('Job failure handling failed', { jobId, error: error.message });
         }
 
         // Log error
-        this.logError('error', 'job_failed', errorMessage, {
+        await this.logError('error', 'job_failed', errorMessage, {
             job_id: jobId,
             user_id: job?.user_id,
-            order_id: job?.order_id
+            order_id: job?.options.order_id
         });
 
         // Clean up
@@ -450,22 +516,16 @@ class JobProcessor {
     /**
      * Log error to database
      */
-    logError(severity, errorCode, errorMessage, context = {}) {
+    async logError(severity, errorCode, errorMessage, context = {}) {
         try {
-            this.db.prepare(`
-                INSERT INTO error_logs (
-                    severity, error_code, error_message, context,
-                    user_id, job_id, order_id, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            `).run(
-                severity,
+            const { error_stack, ...metadata } = context;
+            await db.createErrorLog(
                 errorCode,
                 errorMessage,
-                JSON.stringify(context),
+                error_stack || null,
                 context.user_id || null,
                 context.job_id || null,
-                context.order_id || null,
-                new Date().toISOString()
+                { severity, ...metadata }
             );
         } catch (error) {
             logger.error('Failed to log error', { error: error.message });
@@ -475,29 +535,33 @@ class JobProcessor {
     /**
      * Get job status
      */
-    getJobStatus(jobId) {
-        const job = this.db.prepare(`
-            SELECT j.*, 
-                   (SELECT COUNT(*) FROM job_steps WHERE job_id = j.id) as total_steps,
-                   (SELECT COUNT(*) FROM job_steps WHERE job_id = j.id AND status = 'completed') as completed_steps
-            FROM jobs j
-            WHERE j.id = ?
-        `).get(jobId);
-
+    async getJobStatus(jobId) {
+        const job = await db.getJob(jobId);
         if (!job) return null;
 
-        const steps = this.db.prepare(`
-            SELECT * FROM job_steps 
-            WHERE job_id = ? 
-            ORDER BY step_order ASC
-        `).all(jobId);
+        const steps = await db.getJobSteps(jobId);
 
         return {
             ...job,
+            order_id: job.options.order_id || null,
+            cost_credits: job.options.cost_credits || 0,
+            error_message: job.error || null,
+            total_steps: steps.length,
+            completed_steps: steps.filter(step => step.status === 'completed').length,
             steps: steps.map(step => ({
-                ...step,
-                input_params: step.input_params ? JSON.parse(step.input_params) : null,
-                output_data: step.output_data ? JSON.parse(step.output_data) : null
+                id: step._id.toString(),
+                job_id: jobId,
+                step_order: step.step_order,
+                step_name: step.step_name,
+                a2e_endpoint: step.tool_type,
+                a2e_task_id: step.task_id || null,
+                status: step.status,
+                input_params: step.input_data || null,
+                output_data: step.output_data || null,
+                error_message: step.error_message || null,
+                started_at: step.started_at || null,
+                completed_at: step.completed_at || null,
+                created_at: step.created_at
             }))
         };
     }
@@ -506,12 +570,12 @@ class JobProcessor {
      * Cancel a job
      */
     async cancelJob(jobId) {
-        const job = this.getJobStatus(jobId);
+        const job = await this.getJobStatus(jobId);
         if (!job) {
             throw new Error('Job not found');
         }
 
-        if (job.status === 'completed' || job.status === 'failed') {
+        if (job.status === 'completed' || job.status === 'failed' || job.status === 'cancelled') {
             throw new Error('Cannot cancel completed or failed job');
         }
 
@@ -539,14 +603,15 @@ class JobProcessor {
             }
         }
 
-        // Update job status
-        this.db.prepare('UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?')
-            .run('cancelled', new Date().toISOString(), jobId);
+        // Update job status; loses to a failure or completion that landed meanwhile
+        const cancelled = await db.cancelJob(jobId);
+        if (!cancelled) {
+            throw new Error('Cannot cancel completed or failed job');
+        }
 
         // Refund credits
         if (job.cost_credits > 0) {
-            this.db.prepare('UPDATE user_credits SET balance = balance + ? WHERE user_id = ?')
-                .run(job.cost_credits, job.user_id);
+            await db.releaseCredits(job.user_id, job.cost_credits);
         }
 
         this.activeJobs.delete(jobId);
@@ -49,12 +49,20 @@ class SKUConfigManager {
     /**
      * Validate customer inputs against configuration
      */
-    validateCustomerInputs(skuCode, customerInputs) {
-        const config = this.getConfig(skuCode);
+    async validateCustomerInputs(skuCode, customerInputs) {
+        const config = await this.getConfig(skuCode);
         if (!config) {
             throw new Error(`No configuration found for SKU: ${skuCode}`);
         }
 
+        return this.validateAgainstConfig(config, customerInputs);
+    }
+
+    /**
+     * Validate customer inputs against an already loaded configuration
+     * Lets batch callers check many inputs against one config snapshot
+     */
+    validateAgainstConfig(config, customerInputs) {
         const errors = [];
 
         for (const option of config.customer_options) {
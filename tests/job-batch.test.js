@@ -0,0 +1,353 @@
+const assert = require('assert');
+const db = require('../db/mongo');
+const JobProcessor = require('../services/job-processor');
+
+const CONFIG = {
+    steps: [],
+    customer_options: [
+        { option_key: 'avatar_id', option_label: 'Avatar', option_type: 'text', required: true }
+    ]
+};
+
+const DB_METHODS = ['getSkuByCode', 'reserveCredits', 'releaseCredits', 'createJobs'];
+
+describe('JobProcessor.createJobBatch', () => {
+    let processor;
+    let calls;
+    let originals;
+
+    beforeEach(() => {
+        calls = { getConfig: 0, getSkuByCode: 0, reserveCredits: [], releaseCredits: [], createJobs: [], executeJob: 0 };
+        originals = {};
+        DB_METHODS.forEach(name => { originals[name] = db[name]; });
+
+        db.getSkuByCode = async () => {
+            calls.getSkuByCode++;
+            return { code: 'C1-15', base_credits: 90 };
+        };
+        db.reserveCredits = async (userId, amount) => {
+            calls.reserveCredits.push([userId, amount]);
+            return 1000;
+        };
+        db.releaseCredits = async (userId, amount) => {
+            calls.releaseCredits.push([userId, amount]);
+            return 1000;
+        };
+        db.createJobs = async (userId, type, optionsList) => {
+            calls.createJobs.push(optionsList);
+            return optionsList.map((options, i) => ({ id: `job_${i}`, user_id: userId, type, status: 'pending', options }));
+        };
+
+        processor = new JobProcessor('test-key', 'http://localhost');
+        processor.configManager.getConfig = async () => {
+            calls.getConfig++;
+            return CONFIG;
+        };
+        processor.executeJob = async () => {
+            calls.executeJob++;
+        };
+    });
+
+    afterEach(() => {
+        DB_METHODS.forEach(name => { db[name] = originals[name]; });
+    });
+
+    it('validates every item against one snapshot and charges only accepted items', async () => {
+        const items = [
+            { customer_inputs: { avatar_id: 'a1' }, order_id: 'o1' },
+            { customer_inputs: {} },
+            { customer_inputs: { avatar_id: 'a3' }, order_id: 'o3' }
+        ];
+
+        const { results, credits_reserved } = await processor.createJobBatch('user_1', 'C1-15', items);
+
+        assert.strictEqual(calls.getConfig, 1);
+        assert.strictEqual(calls.getSkuByCode, 1);
+        assert.deepStrictEqual(calls.reserveCredits, [['user_1', 180]]);
+        assert.strictEqual(calls.createJobs.length, 1);
+        assert.strictEqual(credits_reserved, 180);
+
+        assert.deepStrictEqual(results.map(r => [r.index, r.status, r.job_id]), [
+            [0, 'accepted', 'job_0'],
+            [1, 'rejected', undefined],
+            [2, 'accepted', 'job_1']
+        ]);
+        assert.deepStrictEqual(results[1].validation_errors, ['Avatar is required']);
+        assert.strictEqual(calls.createJobs[0][1].order_id, 'o3');
+        assert.strictEqual(calls.executeJob, 2);
+    });
+
+    it('does not touch credits or insert anything when every item is rejected', async () => {
+        const { results, credits_reserved } = await processor.createJobBatch('user_1', 'C1-15', [{ customer_inputs: {} }]);
+
+        assert.strictEqual(results[0].status, 'rejected');
+        assert.strictEqual(credits_reserved, 0);
+        assert.strictEqual(calls.reserveCredits.length, 0);
+        assert.strictEqual(calls.createJobs.length, 0);
+    });
+
+    it('fails the whole batch when the reservation cannot be made', async () => {
+        db.reserveCredits = async () => null;
+
+        await assert.rejects(
+            processor.createJobBatch('user_1', 'C1-15', [{ customer_inputs: { avatar_id: 'a1' } }]),
+            /insufficient_credits/
+        );
+        assert.strictEqual(calls.createJobs.length, 0);
+    });
+
+    it('refunds only the items the bulk insert did not store', async () => {
+        db.createJobs = async (userId, type, optionsList) => {
+            const error = new Error('write failed');
+            error.insertedJobs = [{ id: 'job_0', user_id: userId, type, status: 'pending', options: optionsList[0] }, null];
+            throw error;
+        };
+
+        const { results, credits_reserved } = await processor.createJobBatch('user_1', 'C1-15', [
+            { customer_inputs: { avatar_id: 'a1' } },
+            { customer_inputs: { avatar_id: 'a2' } }
+        ]);
+
+        assert.deepStrictEqual(calls.reserveCredits, [['user_1', 180]]);
+        assert.deepStrictEqual(calls.releaseCredits, [['user_1', 90]]);
+        assert.strictEqual(credits_reserved, 90);
+        assert.deepStrictEqual(results.map(r => [r.status, r.job_id]), [['accepted', 'job_0'], ['failed', undefined]]);
+        assert.strictEqual(calls.executeJob, 1);
+    });
+
+    it('refunds the whole reservation when nothing was stored', async () => {
+        db.createJobs = async () => {
+            const error = new Error('write failed');
+            error.insertedJobs = [null];
+            throw error;
+        };
+
+        await assert.rejects(
+            processor.createJobBatch('user_1', 'C1-15', [{ customer_inputs: { avatar_id: 'a1' } }]),
+            /write failed/
+        );
+        assert.deepStrictEqual(calls.releaseCredits, [['user_1', 90]]);
+        assert.strictEqual(calls.executeJob, 0);
+    });
+
+    it('keeps the reservation when the insert outcome is unknown', async () => {
+        db.createJobs = async () => {
+            throw new Error('write failed');
+        };
+
+        await assert.rejects(
+            processor.createJobBatch('user_1', 'C1-15', [{ customer_inputs: { avatar_id: 'a1' } }]),
+            /write failed/
+        );
+        assert.strictEqual(calls.releaseCredits.length, 0);
+        assert.strictEqual(calls.executeJob, 0);
+    });
+});
+
+describe('JobProcessor.createJob', () => {
+    let processor;
+    let calls;
+    let originals;
+    const METHODS = ['getSkuByCode', 'reserveCredits', 'releaseCredits', 'createJob'];
+
+    beforeEach(() => {
+        calls = { reserveCredits: [], releaseCredits: [], createJob: 0 };
+        originals = {};
+        METHODS.forEach(name => { originals[name] = db[name]; });
+
+        db.getSkuByCode = async () => ({ code: 'C1-15', base_credits: 90 });
+        db.reserveCredits = async (userId, amount) => {
+            calls.reserveCredits.push([userId, amount]);
+            return 910;
+        };
+        db.releaseCredits = async (userId, amount) => {
+            calls.releaseCredits.push([userId, amount]);
+            return 1000;
+        };
+        db.createJob = async () => {
+            calls.createJob++;
+            return { id: 'job_0' };
+        };
+
+        processor = new JobProcessor('test-key', 'http://localhost');
+        processor.configManager.validateCustomerInputs = async () => ({ valid: true, errors: [] });
+        processor.configManager.getConfig = async () => CONFIG;
+        processor.executeJob = async () => {};
+    });
+
+    afterEach(() => {
+        METHODS.forEach(name => { db[name] = originals[name]; });
+    });
+
+    it('charges the SKU price like the batch path', async () => {
+        const jobId = await processor.createJob('user_1', 'o1', 'C1-15', { avatar_id: 'a1' });
+
+        assert.strictEqual(jobId, 'job_0');
+        assert.deepStrictEqual(calls.reserveCredits, [['user_1', 90]]);
+    });
+
+    it('creates nothing when the balance cannot cover the job', async () => {
+        db.reserveCredits = async () => null;
+
+        await assert.rejects(processor.createJob('user_1', 'o1', 'C1-15', { avatar_id: 'a1' }), /insufficient_credits/);
+        assert.strictEqual(calls.createJob, 0);
+    });
+
+    it('hands the charge back when the job cannot be stored', async () => {
+        db.createJob = async () => {
+            throw new Error('write failed');
+        };
+
+        await assert.rejects(processor.createJob('user_1', 'o1', 'C1-15', { avatar_id: 'a1' }), /write failed/);
+        assert.deepStrictEqual(calls.releaseCredits, [['user_1', 90]]);
+    });
+});
+
+describe('JobProcessor.handleJobFailure', () => {
+    let processor;
+    let calls;
+    let originals;
+    const METHODS = ['failJob', 'releaseCredits', 'updateOrderStatus', 'createErrorLog'];
+
+    beforeEach(() => {
+        calls = { releaseCredits: [], updateOrderStatus: [] };
+        originals = {};
+        METHODS.forEach(name => { originals[name] = db[name]; });
+
+        let failed = false;
+        db.failJob = async jobId => {
+            if (failed) return null;
+            failed = true;
+            return { id: jobId, user_id: 'user_1', status: 'failed', options: { order_id: 'o1', cost_credits: 90 } };
+        };
+        db.releaseCredits = async (userId, amount) => {
+            calls.releaseCredits.push([userId, amount]);
+            return 1000;
+        };
+        db.updateOrderStatus = async (orderId, status) => {
+            calls.updateOrderStatus.push([orderId, status]);
+        };
+        db.createErrorLog = async () => {};
+
+        processor = new JobProcessor('test-key', 'http://localhost');
+    });
+
+    afterEach(() => {
+        METHODS.forEach(name => { db[name] = originals[name]; });
+    });
+
+    it('refunds and fails the order once even if reported twice', async () => {
+        await processor.handleJobFailure('job_0', 'boom');
+        await processor.handleJobFailure('job_0', 'boom');
+
+        assert.deepStrictEqual(calls.releaseCredits, [['user_1', 90]]);
+        assert.deepStrictEqual(calls.updateOrderStatus, [['o1', 'failed']]);
+    });
+
+    it('never rejects when the database is unavailable', async () => {
+        db.failJob = async () => {
+            throw new Error('connection lost');
+        };
+
+        await processor.handleJobFailure('job_0', 'boom');
+        assert.strictEqual(calls.releaseCredits.length, 0);
+    });
+});
+
+describe('JobProcessor.executeStep', () => {
+    let processor;
+    let steps;
+    let originals;
+    const METHODS = ['createJobStep', 'updateJobStep', 'getJobStep', 'createErrorLog'];
+    const STEP = {
+        step_order: 0,
+        step_name: 'dub',
+        a2e_endpoint: '/api/v1/video/send_tts',
+        http_method: 'POST',
+        params_template: { text: '${script}' }
+    };
+
+    beforeEach(() => {
+        steps = new Map();
+        originals = {};
+        METHODS.forEach(name => { originals[name] = db[name]; });
+
+        db.createJobStep = async (jobId, stepOrder, toolType, inputData, fields) => {
+            const step = { _id: `step_${steps.size}`, job_id: jobId, step_order: stepOrder, tool_type: toolType, input_data: inputData, ...fields };
+            steps.set(step._id, step);
+            return step;
+        };
+        db.updateJobStep = async (stepId, updates) => Object.assign(steps.get(stepId), updates);
+        db.getJobStep = async stepId => steps.get(stepId);
+        db.createErrorLog = async () => {};
+
+        processor = new JobProcessor('test-key', 'http://localhost');
+    });
+
+    afterEach(() => {
+        METHODS.forEach(name => { db[name] = originals[name]; });
+    });
+
+    it('records a synchronous step as completed in MongoDB', async () => {
+        processor.callA2EEndpoint = async () => ({ data: { audio_url: 'https://a2e/tts.mp3' } });
+
+        const result = await processor.executeStep('job_0', STEP, { script: 'hi' }, []);
+
+        assert.strictEqual(result.status, 'completed');
+        assert.strictEqual(result.result_url, 'https://a2e/tts.mp3');
+        const step = steps.get(result.step_id);
+        assert.strictEqual(step.tool_type, STEP.a2e_endpoint);
+        assert.strictEqual(step.step_name, 'dub');
+        assert.deepStrictEqual(step.input_data, { text: 'hi' });
+    });
+
+    it('marks the step failed when the A2E call throws', async () => {
+        processor.callA2EEndpoint = async () => {
+            throw new Error('a2e down');
+        };
+
+        const result = await processor.executeStep('job_0', STEP, { script: 'hi' }, []);
+
+        assert.strictEqual(result.status, 'failed');
+        assert.strictEqual(steps.get(result.step_id).status, 'failed');
+        assert.strictEqual(steps.get(result.step_id).error_message, 'a2e down');
+    });
+});
+
+describe('JobProcessor.cancelJob', () => {
+    let processor;
+    let calls;
+    let originals;
+    const METHODS = ['getJob', 'getJobSteps', 'cancelJob', 'releaseCredits'];
+
+    beforeEach(() => {
+        calls = { releaseCredits: [] };
+        originals = {};
+        METHODS.forEach(name => { originals[name] = db[name]; });
+
+        let status = 'processing';
+        db.getJob = async jobId => ({ id: jobId, user_id: 'user_1', status, options: { cost_credits: 90 } });
+        db.getJobSteps = async () => [];
+        db.cancelJob = async () => {
+            if (status === 'cancelled') return null;
+            status = 'cancelled';
+            return { status };
+        };
+        db.releaseCredits = async (userId, amount) => {
+            calls.releaseCredits.push([userId, amount]);
+        };
+
+        processor = new JobProcessor('test-key', 'http://localhost');
+    });
+
+    afterEach(() => {
+        METHODS.forEach(name => { db[name] = originals[name]; });
+    });
+
+    it('cancels and refunds a running job once', async () => {
+        await processor.cancelJob('job_0');
+        await assert.rejects(processor.cancelJob('job_0'), /Cannot cancel/);
+
+        assert.deepStrictEqual(calls.releaseCredits, [['user_1', 90]]);
+    });
+});
@@ -0,0 +1,52 @@
+const assert = require('assert');
+const PasswordHasher = require('../FaceShot-ChopShop-web/services/password-hasher');
+
+describe('PasswordHasher', () => {
+    let hasher;
+
+    afterEach(async () => {
+        if (hasher) await hasher.close();
+        hasher = null;
+    });
+
+    it('hashes and compares on worker threads', async () => {
+        hasher = new PasswordHasher({ size: 2, rounds: 4 });
+
+        const hash = await hasher.hash('testpass123');
+
+        assert.ok(hash.startsWith('$2'));
+        assert.strictEqual(await hasher.compare('testpass123', hash), true);
+        assert.strictEqual(await hasher.compare('wrong', hash), false);
+        assert.strictEqual(hasher.stats().completed, 3);
+    });
+
+    it('never runs more workers than the pool size', async () => {
+        hasher = new PasswordHasher({ size: 2, maxQueue: 10, rounds: 4 });
+
+        await Promise.all(Array.from({ length: 6 }, (_, i) => hasher.hash(`password-${i}`)));
+
+        assert.strictEqual(hasher.stats().workers, 2);
+        assert.strictEqual(hasher.stats().completed, 6);
+    });
+
+    it('rejects with HASH_QUEUE_FULL once the queue is full', async () => {
+        hasher = new PasswordHasher({ size: 1, maxQueue: 1, rounds: 4 });
+
+        const accepted = [hasher.hash('a'), hasher.hash('b')];
+        await assert.rejects(hasher.hash('c'), { code: 'HASH_QUEUE_FULL' });
+        await Promise.all(accepted);
+
+        assert.strictEqual(hasher.stats().rejected, 1);
+    });
+
+    it('rejects pending work when closed', async () => {
+        hasher = new PasswordHasher({ size: 1, maxQueue: 4, rounds: 4 });
+
+        const settled = Promise.allSettled([hasher.hash('a'), hasher.hash('b')]);
+        await hasher.close();
+        hasher = null;
+
+        const results = await settled;
+        assert.ok(results.every(r => r.status === 'rejected'));
+    });
+});
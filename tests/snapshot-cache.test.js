@@ -0,0 +1,156 @@
+const assert = require('assert');
+const zlib = require('zlib');
+const SnapshotCache = require('../FaceShot-ChopShop-web/services/snapshot-cache');
+const { matchesETag, negotiateEncoding } = SnapshotCache;
+
+// Minimal stand-in for the Express request/response used by send()
+function mockExchange(headers = {}) {
+    const req = { headers };
+    const res = {
+        statusCode: null,
+        headers: {},
+        body: null,
+        status(code) { this.statusCode = code; return this; },
+        set(name, value) { this.headers[name.toLowerCase()] = value; return this; },
+        end(body) { this.body = body || null; return this; }
+    };
+    return { req, res };
+}
+
+const largePayload = { items: Array.from({ length: 200 }, (_, i) => ({ id: i, name: `tool-${i}` })) };
+
+describe('SnapshotCache', () => {
+    it('builds once and serves hits from memory', async () => {
+        const cache = new SnapshotCache();
+        let builds = 0;
+        const build = async () => { builds++; return { ok: true }; };
+
+        const first = await cache.get('k', build);
+        const second = await cache.get('k', build);
+
+        assert.strictEqual(builds, 1);
+        assert.strictEqual(first, second);
+        assert.strictEqual(cache.counters.hits, 1);
+        assert.strictEqual(cache.counters.misses, 1);
+    });
+
+    it('shares one build between concurrent misses', async () => {
+        const cache = new SnapshotCache();
+        let builds = 0;
+        const build = () => new Promise(resolve => setTimeout(() => { builds++; resolve({ ok: true }); }, 10));
+
+        await Promise.all([cache.get('k', build), cache.get('k', build), cache.get('k', build)]);
+
+        assert.strictEqual(builds, 1);
+    });
+
+    it('rebuilds after the TTL expires', async () => {
+        const cache = new SnapshotCache({ ttlMs: 0 });
+        let builds = 0;
+        const build = async () => ({ n: ++builds });
+
+        await cache.get('k', build);
+        await cache.get('k', build);
+
+        assert.strictEqual(builds, 2);
+    });
+
+    it('invalidates by key prefix', async () => {
+        const cache = new SnapshotCache();
+        await cache.get('skus:', async () => ({ a: 1 }));
+        await cache.get('skus:v1', async () => ({ a: 2 }));
+        await cache.get('plans', async () => ({ a: 3 }));
+
+        cache.invalidate('skus:');
+
+        assert.deepStrictEqual([...cache.entries.keys()], ['plans']);
+    });
+
+    it('does not store a build that raced an invalidation', async () => {
+        const cache = new SnapshotCache();
+        let release;
+        const pending = cache.get('k', () => new Promise(resolve => { release = resolve; }));
+
+        cache.invalidate();
+        release({ stale: true });
+        await pending;
+
+        assert.strictEqual(cache.entries.has('k'), false);
+    });
+
+    it('serves an uncached build without storing it', async () => {
+        const cache = new SnapshotCache();
+        let builds = 0;
+        const build = async () => { builds++; return SnapshotCache.uncached({ fallback: true }); };
+
+        const first = await cache.get('k', build);
+        await cache.get('k', build);
+
+        assert.strictEqual(JSON.parse(first.body).fallback, true);
+        assert.strictEqual(builds, 2);
+        assert.strictEqual(cache.entries.has('k'), false);
+    });
+
+    it('evicts the oldest entry beyond maxEntries', async () => {
+        const cache = new SnapshotCache({ maxEntries: 2 });
+        for (const key of ['a', 'b', 'c']) await cache.get(key, async () => ({ key }));
+
+        assert.deepStrictEqual([...cache.entries.keys()], ['b', 'c']);
+    });
+
+    it('answers a matching If-None-Match with 304 and no body', async () => {
+        const cache = new SnapshotCache();
+        const build = async () => ({ ok: true });
+
+        const first = mockExchange();
+        await cache.send(first.req, first.res, 'k', build);
+        assert.strictEqual(first.res.statusCode, 200);
+        assert.ok(first.res.headers.etag);
+
+        const second = mockExchange({ 'if-none-match': first.res.headers.etag });
+        await cache.send(second.req, second.res, 'k', build);
+        assert.strictEqual(second.res.statusCode, 304);
+        assert.strictEqual(second.res.body, null);
+        assert.strictEqual(cache.counters.not_modified, 1);
+    });
+
+    it('serves a pre-compressed variant when the client accepts it', async () => {
+        const cache = new SnapshotCache();
+        const { req, res } = mockExchange({ 'accept-encoding': 'gzip, deflate' });
+
+        await cache.send(req, res, 'k', async () => largePayload);
+
+        assert.strictEqual(res.headers['content-encoding'], 'gzip');
+        assert.strictEqual(res.headers.vary, 'Accept-Encoding');
+        assert.deepStrictEqual(JSON.parse(zlib.gunzipSync(res.body)), largePayload);
+        assert.ok(res.body.length < JSON.stringify(largePayload).length);
+    });
+
+    it('sends small payloads uncompressed', async () => {
+        const cache = new SnapshotCache();
+        const { req, res } = mockExchange({ 'accept-encoding': 'br, gzip' });
+
+        await cache.send(req, res, 'k', async () => ({ ok: true }));
+
+        assert.strictEqual(res.headers['content-encoding'], undefined);
+        assert.deepStrictEqual(JSON.parse(res.body), { ok: true });
+    });
+});
+
+describe('conditional request helpers', () => {
+    it('matches weak and strong forms of the same tag', () => {
+        assert.strictEqual(matchesETag('"abc"', 'W/"abc"'), true);
+        assert.strictEqual(matchesETag('W/"old", W/"abc"', 'W/"abc"'), true);
+        assert.strictEqual(matchesETag('*', 'W/"abc"'), true);
+        assert.strictEqual(matchesETag('W/"other"', 'W/"abc"'), false);
+        assert.strictEqual(matchesETag(undefined, 'W/"abc"'), false);
+    });
+
+    it('prefers brotli, honours q=0 and falls back to identity', () => {
+        const entry = { gzip: Buffer.alloc(1), br: Buffer.alloc(1) };
+        assert.strictEqual(negotiateEncoding('gzip, br', entry), 'br');
+        assert.strictEqual(negotiateEncoding('br;q=0, gzip', entry), 'gzip');
+        assert.strictEqual(negotiateEncoding('identity', entry), null);
+        assert.strictEqual(negotiateEncoding(undefined, entry), null);
+    });
+});